@@ -0,0 +1,479 @@
+# Load-test harness for the main COSA request flows.
+#
+# Seeds a throwaway SQLite database with synthetic users, applications, job
+# postings and reports at each requested size, drives the app with several
+# concurrent clients (Flask test clients, or real HTTP against a local
+# threaded WSGI server with --server) and writes latency percentiles,
+# throughput and SQL queries per request for every route as JSON.
+#
+#   python benchmark.py --sizes 100,1000,10000 --requests 200 --concurrency 8
+#   python benchmark.py --server --routes login,application_review -o bench.json
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.cookiejar import CookieJar
+from io import BytesIO
+from urllib import error, parse
+from urllib import request as urlrequest
+
+import pyotp
+
+PASSWORD = "benchmark"
+TWO_FACTOR_SECRET = pyotp.random_base32()
+FIRST_NAMES = ["Alex", "Sam", "Priya", "Wei", "Fatima", "Diego", "Noor", "Jordan"]
+LAST_NAMES = ["Smith", "Khan", "Nguyen", "Garcia", "Patel", "Chen", "Ali", "Brown"]
+JOB_WORDS = ["Python", "Data", "Web", "Cloud", "Security", "QA", "Mobile", "ML"]
+JOB_ROLES = ["Developer", "Analyst", "Engineer", "Intern", "Tester", "Designer"]
+SERVER_TIMING_QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+CITIES = ["Toronto", "Ottawa", "Waterloo", "Montreal", "Vancouver", "Remote"]
+
+
+def pdf_bytes(n):
+    # Minimal single-page PDF; the counter makes each upload a distinct blob.
+    return (
+        b"%PDF-1.4\n1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n"
+        b"2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj\n"
+        b"3 0 obj << /Type /Page /Parent 2 0 R >> endobj\n"
+        b"4 0 obj << /Length 30 >> stream\nBT (Benchmark report "
+        + str(n).encode()
+        + b") Tj ET\nendstream endobj\n%%EOF\n"
+    )
+
+
+def seed(m, size, rng):
+    # size students, plus a coordinator, an admin, a 2FA user and one employer
+    # per 50 students; one application per student, size // 10 postings and
+    # size // 2 reports. Rows go in with executemany, sharing one hash.
+    db = m.db
+    db.drop_all()
+    m.apply_migrations()
+    m.invalidate_job_board()
+
+    password_hash = m.hash_password(PASSWORD)
+    now = datetime.utcnow()
+    users = [
+        {"role": role, "username": role, "email": f"{role}@bench.test"}
+        for role in ("admin", "coordinator")
+    ]
+    users.append(
+        {
+            "role": "student",
+            "username": "twofactor",
+            "email": "twofactor@bench.test",
+            "two_factor_secret": TWO_FACTOR_SECRET,
+            "two_factor_enabled": True,
+            "two_factor_initiated": True,
+        }
+    )
+    employers = max(1, size // 50)
+    users += [
+        {"role": "employer", "username": f"employer{i}", "email": f"e{i}@bench.test"}
+        for i in range(employers)
+    ]
+    users += [
+        {
+            "role": "student",
+            "username": f"student{i}",
+            "email": f"s{i}@bench.test",
+            "student_id": f"{500000000 + i}",
+        }
+        for i in range(size)
+    ]
+    for user in users:
+        user.setdefault("name", f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        user["password_hash"] = password_hash
+        user["created_at"] = now - timedelta(minutes=rng.randrange(525600))
+    db.session.execute(db.insert(m.User), users)
+    db.session.commit()
+
+    ids = dict(db.session.execute(db.select(m.User.username, m.User.id)).all())
+    employer_ids = [ids[f"employer{i}"] for i in range(employers)]
+    student_ids = [ids[f"student{i}"] for i in range(size)]
+    term = m.current_term()
+    db.session.execute(
+        db.insert(m.CoopApplication),
+        [
+            {
+                "user_id": ids[user["username"]],
+                "term": term,
+                "full_name": user["name"],
+                "address": f"{rng.randrange(1, 999)} Main St",
+                "dob": datetime(2000 + rng.randrange(6), 1 + rng.randrange(12), 1),
+                "student_number": user["student_id"],
+                "student_year": rng.randrange(1, 5),
+                "linkedin": f"https://linkedin.com/in/{user['username']}",
+                "status": rng.choice(m.APPLICATION_STATUSES),
+            }
+            for user in users
+            if user.get("student_id")
+        ],
+    )
+    db.session.execute(
+        db.insert(m.JobPosting),
+        [
+            {
+                "employer_id": rng.choice(employer_ids),
+                "title": f"{rng.choice(JOB_WORDS)} {rng.choice(JOB_ROLES)}",
+                "description": " ".join(rng.choices(JOB_WORDS + JOB_ROLES, k=40)),
+                "location": rng.choice(CITIES),
+                "job_type": rng.choice(["full_time", "part_time", "remote"]),
+                "deadline": now + timedelta(days=rng.randrange(-30, 90)),
+            }
+            for _ in range(max(1, size // 10))
+        ],
+    )
+    db.session.execute(
+        db.insert(m.Report),
+        [
+            {
+                "student_id": rng.choice(student_ids),
+                "pdf_filename": "seed.pdf",
+                "report_type": rng.choice(list(m.REPORT_TYPES)),
+                "submitted_at": now - timedelta(days=rng.randrange(365)),
+                "processing_status": "ready",
+            }
+            for _ in range(size // 2)
+        ],
+    )
+    db.session.commit()
+
+
+class TestClientSession:
+    def __init__(self, app, base_url=None):
+        self.client = app.test_client()
+
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.headers
+
+    def post(self, path, data, files=None):
+        if files:
+            data = dict(data, **files)
+        response = self.client.post(path, data=data)
+        return response.status_code, response.headers
+
+
+class NoRedirect(urlrequest.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPSession:
+    def __init__(self, app, base_url):
+        self.base_url = base_url
+        self.opener = urlrequest.build_opener(
+            urlrequest.HTTPCookieProcessor(CookieJar()), NoRedirect()
+        )
+
+    def get(self, path):
+        return self.open(urlrequest.Request(self.base_url + path))
+
+    def post(self, path, data, files=None):
+        if files:
+            body, content_type = multipart(data, files)
+        else:
+            body = parse.urlencode(data).encode()
+            content_type = "application/x-www-form-urlencoded"
+        return self.open(
+            urlrequest.Request(
+                self.base_url + path, data=body, headers={"Content-Type": content_type}
+            )
+        )
+
+    def open(self, req):
+        try:
+            with self.opener.open(req) as response:
+                response.read()
+                return response.status, response.headers
+        except error.HTTPError as e:
+            e.read()
+            return e.code, e.headers
+
+
+def multipart(data, files):
+    boundary = f"bench{random.getrandbits(64):x}"
+    parts = []
+    for name, value in data.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+            f"\r\n\r\n{value}\r\n".encode()
+        )
+    for name, (stream, filename) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: application/pdf\r\n\r\n'.encode()
+            + stream.read()
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def login(session, username):
+    status, _ = session.post("/login", {"username": username, "password": PASSWORD})
+    if status != 302:
+        raise RuntimeError(f"Login as {username} failed with HTTP {status}.")
+
+
+# Each route is (setup once per client, untimed prepare per request, timed
+# request). n is a run-wide request counter, size the number of students.
+def login_as(username):
+    return lambda session, client, size: login(session, username)
+
+
+def no_setup(session, client, size):
+    pass
+
+
+def student_login(session, client, size):
+    login(session, f"student{client % size}")
+
+
+ROUTES = {
+    "login": (
+        no_setup,
+        None,
+        lambda m, session, n, size: session.post(
+            "/login", {"username": f"student{n % size}", "password": PASSWORD}
+        ),
+    ),
+    "two_factor": (
+        no_setup,
+        lambda session, n, size: login(session, "twofactor"),
+        lambda m, session, n, size: session.post(
+            "/two_factor", {"code": pyotp.TOTP(TWO_FACTOR_SECRET).now()}
+        ),
+    ),
+    "application_review": (
+        login_as("coordinator"),
+        None,
+        lambda m, session, n, size: session.get("/application_review"),
+    ),
+    "admin_dashboard": (
+        login_as("admin"),
+        None,
+        lambda m, session, n, size: session.get("/dashboard/admin"),
+    ),
+    "upload_report": (
+        student_login,
+        None,
+        lambda m, session, n, size: session.post(
+            "/upload_report",
+            {"reportType": list(m.REPORT_TYPES)[n % len(m.REPORT_TYPES)]},
+            files={"file": (BytesIO(pdf_bytes(n)), f"report{n}.pdf")},
+        ),
+    ),
+    "submit_application": (
+        no_setup,
+        # Every student already applied for the current term, so each request
+        # logs in a fresh student and applies for the next one.
+        lambda session, n, size: login(session, f"student{n % size}"),
+        lambda m, session, n, size: session.post(
+            "/submit_application",
+            {
+                "fullname": f"Student {n}",
+                "addressline1": "1 Main St",
+                "addressline2": "Toronto",
+                "dob": "2001-01-01",
+                "studentnum": f"{500000000 + n % size}",
+                "level": "3",
+                "linkedin": f"https://linkedin.com/in/student{n}",
+                "term": m.upcoming_terms()[1],
+            },
+        ),
+    ),
+}
+
+
+def query_count(server_timing):
+    # The app reports per-request SQL in Server-Timing: db;desc="N queries".
+    match = SERVER_TIMING_QUERIES_RE.search(server_timing)
+    return int(match.group(1)) if match else 0
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_route(m, make_session, name, size, requests, concurrency):
+    setup, prepare, send = ROUTES[name]
+    lock = threading.Lock()
+    counter = iter(range(requests))
+    latencies = []
+    queries = []
+    errors = []
+    busy = [0.0] * concurrency
+
+    def client(index):
+        session = make_session()
+        setup(session, index, size)
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                return
+            try:
+                if prepare:
+                    prepare(session, n, size)
+                start = time.perf_counter()
+                status, headers = send(m, session, n, size)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            busy[index] += elapsed
+            with lock:
+                latencies.append(elapsed * 1000)
+                queries.append(query_count(headers.get("Server-Timing", "")))
+                if status >= 500:
+                    errors.append(f"HTTP {status}")
+
+    threads = [
+        threading.Thread(target=client, args=(i,), daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    # Throughput over the time clients spent inside timed requests, so the
+    # untimed per-request logins of some routes don't count against them.
+    elapsed = max(busy) or None
+    return {
+        "route": name,
+        "size": size,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "throughput_rps": len(latencies) / elapsed if elapsed else None,
+        "sql_queries_per_request": sum(queries) / len(queries) if queries else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark COSA request flows.")
+    parser.add_argument("--sizes", default="100,1000", help="comma-separated")
+    parser.add_argument("--requests", type=int, default=200, help="per route")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma-separated")
+    parser.add_argument(
+        "--server", action="store_true", help="drive a local WSGI server over HTTP"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    routes = [route for route in args.routes.split(",") if route]
+    unknown = [route for route in routes if route not in ROUTES]
+    if unknown:
+        parser.error(f"unknown route(s): {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="cosa-bench-")
+    # Let every benchmark thread wait on the hashing pool instead of getting
+    # the 503 meant for a server's last free threads. The limit is read when
+    # master is imported.
+    os.environ.setdefault("PASSWORD_HASH_MAX_PENDING", str(args.concurrency))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import master as m
+
+    m.create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+            "BLOB_FOLDER": os.path.join(workdir, "blobs"),
+            "SERVER_TIMING": True,
+        }
+    )
+    os.makedirs(m.app.config["UPLOAD_FOLDER"], exist_ok=True)
+
+    server = None
+    base_url = None
+    if args.server:
+        from werkzeug.serving import make_server
+
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        server = make_server("127.0.0.1", 0, m.app, threaded=True)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    session_class = HTTPSession if args.server else TestClientSession
+
+    results = []
+    rng = random.Random(args.seed)
+    for size in sizes:
+        with m.app.app_context():
+            seed(m, size, rng)
+        for route in routes:
+            result = run_route(
+                m,
+                lambda: session_class(m.app, base_url),
+                route,
+                size,
+                args.requests,
+                args.concurrency,
+            )
+            results.append(result)
+            print(
+                f"{size:>7} {route:<20} p50 {result['p50_ms'] or 0:8.1f}ms "
+                f"p95 {result['p95_ms'] or 0:8.1f}ms "
+                f"p99 {result['p99_ms'] or 0:8.1f}ms "
+                f"{result['throughput_rps'] or 0:8.1f} req/s "
+                f"{result['sql_queries_per_request'] or 0:5.1f} queries "
+                f"{result['errors']} errors",
+                file=sys.stderr,
+            )
+
+    if server:
+        server.shutdown()
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "mode": "server" if args.server else "test_client",
+        "concurrency": args.concurrency,
+        "requests_per_route": args.requests,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,542 @@
 import os
-from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+import csv
+import hashlib
+import io
+import ipaddress
+import json
+import gzip
+import logging
+import math
+import mimetypes
+import multiprocessing
+import queue
+import re
+import secrets
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
+import click
+from flask import (
+    Flask,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    session,
+    g,
+    abort,
+    appcontext_pushed,
+    send_file,
+    send_from_directory,
+    stream_with_context,
+    has_request_context,
+)
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import (
+    SecureCookieSessionInterface,
+    SessionInterface,
+    SessionMixin,
+)
 from flask_sqlalchemy import SQLAlchemy
+from itsdangerous import BadSignature
+from markupsafe import Markup, escape
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex, CreateTable, DropIndex
+from werkzeug.datastructures import CallbackDict
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.utils import secure_filename
 import pyotp
 import qrcode
+import qrcode.image.svg
+from PIL import Image
 from io import BytesIO
 import base64
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 app = Flask(__name__)
-app.config["SECRET_KEY"] = "your_secret_key_here"
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///cosa.db"
+app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "your_secret_key_here")
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+    "DATABASE_URL", "sqlite:///cosa.db"
+)
+app.config["DB_POOL_SIZE"] = int(os.environ.get("DB_POOL_SIZE", 10))
+app.config["DB_MAX_OVERFLOW"] = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+app.config["DB_POOL_TIMEOUT"] = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+app.config["DB_POOL_RECYCLE"] = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer, and busy_timeout makes writers wait instead of failing with
+# "database is locked".
+app.config["SQLITE_PRAGMAS"] = {
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
 app.config["UPLOAD_FOLDER"] = os.path.join(os.getcwd(), "uploads")
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024
-db = SQLAlchemy(app)
+app.config["BLOB_FOLDER"] = os.path.join(app.config["UPLOAD_FOLDER"], "blobs")
+# Files uploaded to /import_data and their error reports.
+app.config["IMPORT_FOLDER"] = os.path.join(app.config["UPLOAD_FOLDER"], "imports")
+app.config["UPLOAD_CHUNK_SIZE"] = 64 * 1024
+app.config["REPORT_DOWNLOAD_MAX_AGE"] = 3600
+# "flask --app master build-assets" writes minified, content-hashed copies of
+# static/ into static/<ASSET_BUILD_DIR> with a manifest that url_for("static")
+# follows. Their names change with their content, so they're cached forever.
+app.config["ASSET_BUILD_DIR"] = "dist"
+app.config["ASSET_MAX_AGE"] = 365 * 24 * 3600
+# Rendered pages cached by cached_page(), per template, URL, user and data
+# version. HTML responses of at least COMPRESS_MIN_SIZE bytes are sent
+# gzip- or brotli-compressed to clients that accept it.
+app.config["RESPONSE_CACHE_TTL"] = 300
+app.config["RESPONSE_CACHE_SIZE"] = 1024
+app.config["COMPRESS_MIN_SIZE"] = 500
+app.config["COMPRESS_LEVEL"] = 6
+# Background jobs are queued in the job table and run by JOB_WORKERS threads
+# started on first use (0 leaves them to "flask --app master process-jobs").
+app.config["JOB_WORKERS"] = int(os.environ.get("JOB_WORKERS", 2))
+app.config["JOB_POLL_INTERVAL"] = 5
+app.config["JOB_MAX_ATTEMPTS"] = 3
+app.config["JOB_LOCK_TIMEOUT"] = 300
+# Seconds a worker waits after an unexpected error before polling again.
+app.config["JOB_ERROR_BACKOFF"] = 5
+app.config["REPORT_TEXT_LIMIT"] = 64 * 1024
+app.config["THUMBNAIL_SIZE"] = (200, 260)
+app.config["REMINDER_REFRESH_INTERVAL"] = 3600
+app.config["REMINDER_DEADLINE_WINDOW_DAYS"] = 14
+app.config["EVENT_POLL_INTERVAL"] = 1
+app.config["EVENT_HEARTBEAT_INTERVAL"] = 15
+app.config["EVENT_RETRY_INTERVAL"] = 5000  # milliseconds, sent to EventSource
+app.config["EVENT_QUEUE_SIZE"] = 100
+app.config["APPLICATION_PAGE_SIZE"] = 50
+app.config["BULK_DECISION_BATCH_SIZE"] = 1000
+app.config["USER_PAGE_SIZE"] = 50
+app.config["JOB_PAGE_SIZE"] = 20
+app.config["JOB_BOARD_CACHE_TTL"] = 60
+app.config["JOB_BOARD_CACHE_SIZE"] = 512
+app.config["IMPORT_CHUNK_SIZE"] = 1000
+app.config["IMPORT_PAGE_SIZE"] = 20
+# Analytics aggregates are cached under the current data version, so entries
+# only expire early when nothing has changed for ANALYTICS_CACHE_TTL seconds.
+app.config["ANALYTICS_CACHE_TTL"] = 3600
+app.config["ANALYTICS_CACHE_SIZE"] = 128
+app.config["EXPORT_BATCH_SIZE"] = 1000
+# Signed-in sessions live in the user_session table. Expiry slides forward
+# at most once per SESSION_REFRESH_INTERVAL seconds so most requests don't
+# write. Anonymous sessions, which only carry flashed messages, stay in a
+# signed cookie so visitors never write to the database.
+app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(days=7)
+app.config["SESSION_REFRESH_INTERVAL"] = 3600
+app.config["SESSION_SWEEP_INTERVAL"] = 3600
+# Failed login and 2FA attempts allowed per sliding window, as (attempts,
+# seconds), counted per client IP and per account. Counters live in process
+# memory unless RATE_LIMIT_DB names a SQLite file shared by all workers.
+app.config["RATE_LIMITS"] = {
+    "login_ip": (20, 300),
+    "login_account": (5, 300),
+    "two_factor_ip": (20, 300),
+    "two_factor_account": (5, 300),
+}
+app.config["RATE_LIMIT_DB"] = os.environ.get("RATE_LIMIT_DB")
+# Reverse proxies in front of the app whose X-Forwarded-For and
+# X-Forwarded-Proto are trusted. The per-IP limits use the client address
+# this recovers. With none configured, loopback clients skip the per-IP
+# limits, because behind an unconfigured proxy every request looks like
+# loopback.
+app.config["TRUSTED_PROXIES"] = int(os.environ.get("TRUSTED_PROXIES", 0))
+app.config["RATE_LIMIT_MAX_KEYS"] = 100000
+app.config["RATE_LIMIT_SWEEP_INTERVAL"] = 600
+# "inline" embeds the 2FA setup QR code as a data URI, "endpoint" links to the
+# separately cacheable two_factor_qr route instead.
+app.config["QR_CODE_MODE"] = "inline"
+app.config["QR_CODE_FORMAT"] = "png"
+app.config["QR_CODE_MAX_AGE"] = 300
+# Password hashes are computed in a separate process pool so slow KDFs don't
+# tie up request threads. Set PASSWORD_HASH_WORKERS (below) to 0 to hash
+# inline.
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get(
+    "PASSWORD_HASH_METHOD", "scrypt:32768:8:1"
+)
+app.config["PASSWORD_SALT_LENGTH"] = 16
+# Statements slower than SLOW_QUERY_MS go to the "cosa.slow_queries" logger,
+# and to SLOW_QUERY_LOG if set, with bind parameter values redacted.
+app.config["SLOW_QUERY_MS"] = float(os.environ.get("SLOW_QUERY_MS", 100))
+app.config["SLOW_QUERY_LOG"] = os.environ.get("SLOW_QUERY_LOG")
+# A SELECT repeated this many times in one request is reported as an N+1.
+app.config["N_PLUS_ONE_THRESHOLD"] = 5
+app.config["REQUEST_LATENCY_BUCKETS"] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+# With QUERY_PLAN_CHECK=1, the first run of each SELECT per endpoint is run
+# through EXPLAIN QUERY PLAN (SQLite only) and full table scans are logged to
+# the slow query log, except for the (endpoint, table) pairs listed here.
+app.config["QUERY_PLAN_CHECK"] = os.environ.get("QUERY_PLAN_CHECK") == "1"
+# The unfiltered first pages of these lists read the table in primary key
+# order and stop after one page.
+app.config["QUERY_PLAN_ALLOWED_SCANS"] = {
+    ("admin_dashboard", "user"),
+    ("manage_user", "user"),
+    ("application_review", "coop_application"),
+}
+# /metrics is only served with this bearer token, and is disabled without
+# one. Behind a reverse proxy every request arrives from loopback, so the
+# client address proves nothing.
+app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+# Per-request SQL counts and timings in a Server-Timing header, for
+# development and benchmarking. Always on in debug mode.
+app.config["SERVER_TIMING"] = os.environ.get("SERVER_TIMING") == "1"
+# Production server used by "python master.py" / "flask --app master serve":
+# SERVER_WORKERS processes with SERVER_THREADS threads each. SERVER_TIMEOUT
+# restarts a worker process whose main loop stops sending heartbeats for
+# that many seconds. With gthread workers it doesn't limit how long a single
+# request runs. Long work goes to the job queue instead, and blocking steps
+# have their own limits (busy_timeout, EVENT_STREAM_TIMEOUT, pdftoppm's).
+app.config["SERVER_BIND"] = os.environ.get("BIND", "127.0.0.1:5000")
+app.config["SERVER_WORKERS"] = int(
+    os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)
+)
+app.config["SERVER_THREADS"] = int(os.environ.get("SERVER_THREADS", 4))
+app.config["SERVER_KEEPALIVE"] = int(os.environ.get("SERVER_KEEPALIVE", 5))
+app.config["SERVER_TIMEOUT"] = int(os.environ.get("SERVER_TIMEOUT", 30))
+app.config["SERVER_GRACEFUL_TIMEOUT"] = int(
+    os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30)
+)
+# Every server process gets its own hashing pool, so the CPUs are shared out
+# between SERVER_WORKERS pools rather than each pool sizing itself to the
+# whole machine.
+app.config["PASSWORD_HASH_WORKERS"] = int(
+    os.environ.get(
+        "PASSWORD_HASH_WORKERS",
+        max(1, (os.cpu_count() or 1) // app.config["SERVER_WORKERS"]),
+    )
+)
+# Request threads that may wait on the hashing pool at once. Kept below
+# SERVER_THREADS so a login burst gets 503s instead of occupying every thread
+# and stalling other pages.
+app.config["PASSWORD_HASH_MAX_PENDING"] = int(
+    os.environ.get(
+        "PASSWORD_HASH_MAX_PENDING", max(1, app.config["SERVER_THREADS"] - 1)
+    )
+)
+# Bulk imports hash in a pool of their own so a large upload can't queue
+# ahead of logins. The import-data command sizes it to the machine instead.
+app.config["IMPORT_HASH_WORKERS"] = int(os.environ.get("IMPORT_HASH_WORKERS", 1))
+# Each open /application_events stream holds a server thread, so at most
+# EVENT_MAX_STREAMS per process stream, for up to EVENT_STREAM_TIMEOUT
+# seconds before the browser reconnects. Clients over the cap get one
+# poll-style response and come back after EVENT_BUSY_RETRY_INTERVAL ms.
+app.config["EVENT_MAX_STREAMS"] = int(
+    os.environ.get("EVENT_MAX_STREAMS", max(1, app.config["SERVER_THREADS"] // 2))
+)
+app.config["EVENT_STREAM_TIMEOUT"] = 25
+app.config["EVENT_BUSY_RETRY_INTERVAL"] = 15000
+
+
+def database_engine_options(uri):
+    url = make_url(uri)
+    pool_options = {
+        "pool_size": app.config["DB_POOL_SIZE"],
+        "max_overflow": app.config["DB_MAX_OVERFLOW"],
+        "pool_timeout": app.config["DB_POOL_TIMEOUT"],
+    }
+    if url.get_backend_name() == "sqlite":
+        # In-memory databases use a single shared connection and take no
+        # pool sizing.
+        if url.database in (None, "", ":memory:"):
+            return {}
+        return pool_options
+    return dict(
+        pool_options, pool_recycle=app.config["DB_POOL_RECYCLE"], pool_pre_ping=True
+    )
+
+
+app.wsgi_app = ProxyFix(
+    app.wsgi_app,
+    x_for=app.config["TRUSTED_PROXIES"],
+    x_proto=app.config["TRUSTED_PROXIES"],
+)
+
+# Bound to the app by init_database(), so the engine is only built once the
+# final config is known.
+db = SQLAlchemy()
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config["SQLITE_PRAGMAS"].items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+class Metrics:
+    # Process-local counters and histograms rendered in the Prometheus text
+    # format. Each worker process keeps its own; scrape every worker.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = OrderedDict()
+
+    def describe(self, name, kind, help_text, buckets=None):
+        self.families[name] = {
+            "kind": kind,
+            "help": help_text,
+            "buckets": buckets,
+            "samples": {},
+        }
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        family = self.families[name]
+        with self.lock:
+            family["samples"][key] = family["samples"].get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        family = self.families[name]
+        with self.lock:
+            sample = family["samples"].get(key)
+            if sample is None:
+                sample = family["samples"][key] = {
+                    "buckets": [0] * len(family["buckets"]),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(family["buckets"]):
+                if value <= bound:
+                    sample["buckets"][i] += 1
+            sample["sum"] += value
+            sample["count"] += 1
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, family in self.families.items():
+                lines.append(f"# HELP {name} {family['help']}")
+                lines.append(f"# TYPE {name} {family['kind']}")
+                for key, sample in sorted(family["samples"].items()):
+                    if family["kind"] != "histogram":
+                        lines.append(f"{name}{metric_labels(key)} {sample}")
+                        continue
+                    for bound, count in zip(family["buckets"], sample["buckets"]):
+                        le = metric_labels(key + (("le", bound),))
+                        lines.append(f"{name}_bucket{le} {count}")
+                    le = metric_labels(key + (("le", "+Inf"),))
+                    lines.append(f"{name}_bucket{le} {sample['count']}")
+                    lines.append(f"{name}_sum{metric_labels(key)} {sample['sum']}")
+                    lines.append(f"{name}_count{metric_labels(key)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def metric_labels(key):
+    if not key:
+        return ""
+    pairs = []
+    for name, value in key:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+metrics = Metrics()
+metrics.describe(
+    "cosa_request_duration_seconds",
+    "histogram",
+    "Request latency by endpoint.",
+    buckets=app.config["REQUEST_LATENCY_BUCKETS"],
+)
+metrics.describe(
+    "cosa_db_statements_total", "counter", "SQL statements executed by endpoint."
+)
+metrics.describe(
+    "cosa_db_seconds_total", "counter", "Time spent executing SQL by endpoint."
+)
+metrics.describe(
+    "cosa_orm_rows_loaded_total", "counter", "ORM rows loaded into objects by endpoint."
+)
+metrics.describe(
+    "cosa_n_plus_one_total",
+    "counter",
+    "Requests that repeated a SELECT N_PLUS_ONE_THRESHOLD or more times.",
+)
+metrics.describe(
+    "cosa_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_MS."
+)
+metrics.describe(
+    "cosa_full_table_scans_total",
+    "counter",
+    "Distinct statements whose query plan scans a whole table (QUERY_PLAN_CHECK).",
+)
+
+slow_query_logger = logging.getLogger("cosa.slow_queries")
+if app.config["SLOW_QUERY_LOG"]:
+    slow_query_handler = logging.FileHandler(app.config["SLOW_QUERY_LOG"])
+    slow_query_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_logger.addHandler(slow_query_handler)
+reported_n_plus_one = set()
+checked_query_plans = set()
+# (endpoint, statement) -> tables scanned, for check-query-plans.
+full_table_scans = {}
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def current_endpoint():
+    if has_request_context():
+        return request.endpoint or "unmatched"
+    return "background"
+
+
+def redact_parameters(parameters, executemany):
+    # Log the shape of the bind parameters, never their values: they include
+    # password hashes, 2FA secrets and personal details.
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {name: redact_value(value) for name, value in parameters.items()}
+    return [redact_value(value) for value in parameters or ()]
+
+
+def redact_value(value):
+    return None if value is None else f"<{type(value).__name__}>"
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    if (
+        app.config["QUERY_PLAN_CHECK"]
+        and conn.dialect.name == "sqlite"
+        and statement.lstrip().upper().startswith("SELECT")
+    ):
+        check_query_plan(cursor, statement, parameters)
+    stats = g.get("sql_stats") if has_request_context() else None
+    if stats is not None:
+        stats["count"] += 1
+        stats["seconds"] += elapsed
+        stats["statements"][statement] += 1
+    if elapsed * 1000 >= app.config["SLOW_QUERY_MS"]:
+        endpoint = current_endpoint()
+        metrics.inc("cosa_slow_queries_total", endpoint=endpoint)
+        slow_query_logger.warning(
+            "%.1f ms endpoint=%s statement=%s parameters=%s",
+            elapsed * 1000,
+            endpoint,
+            " ".join(statement.split()),
+            redact_parameters(parameters, executemany),
+        )
+
+
+def check_query_plan(cursor, statement, parameters):
+    endpoint = current_endpoint()
+    key = (endpoint, statement)
+    if key in checked_query_plans:
+        return
+    checked_query_plans.add(key)
+    # Run on the raw DBAPI connection so it isn't counted as a request query.
+    plan = cursor.connection.execute(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    ).fetchall()
+    tables = [
+        match.group(1)
+        for *_, detail in plan
+        if (match := FULL_SCAN.match(detail))
+        and (endpoint, match.group(1)) not in app.config["QUERY_PLAN_ALLOWED_SCANS"]
+    ]
+    if tables:
+        full_table_scans[key] = tables
+        metrics.inc("cosa_full_table_scans_total", endpoint=endpoint)
+        slow_query_logger.warning(
+            "full table scan of %s: endpoint=%s statement=%s",
+            ", ".join(tables),
+            endpoint,
+            " ".join(statement.split()),
+        )
+
+
+@event.listens_for(db.Model, "load", propagate=True)
+def count_loaded_row(target, context):
+    stats = g.get("sql_stats") if has_request_context() else None
+    if stats is not None:
+        stats["rows"] += 1
+
+
+@app.before_request
+def start_request_timer():
+    # Also called when the session is opened, before this hook, so the
+    # session store's statements are counted.
+    if "request_started" in g:
+        return
+    g.request_started = time.perf_counter()
+    g.sql_stats = {"count": 0, "seconds": 0.0, "rows": 0, "statements": Counter()}
+
+
+@app.after_request
+def record_request_metrics(response):
+    if "request_started" not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    stats = g.sql_stats
+    endpoint = current_endpoint()
+    metrics.observe("cosa_request_duration_seconds", elapsed, endpoint=endpoint)
+    metrics.inc("cosa_db_statements_total", stats["count"], endpoint=endpoint)
+    metrics.inc("cosa_db_seconds_total", stats["seconds"], endpoint=endpoint)
+    metrics.inc("cosa_orm_rows_loaded_total", stats["rows"], endpoint=endpoint)
+
+    repeated = [
+        (statement, count)
+        for statement, count in stats["statements"].items()
+        if count >= app.config["N_PLUS_ONE_THRESHOLD"]
+        and statement.lstrip().upper().startswith("SELECT")
+    ]
+    if repeated:
+        metrics.inc("cosa_n_plus_one_total", endpoint=endpoint)
+    for statement, count in repeated:
+        if (endpoint, statement) not in reported_n_plus_one:
+            reported_n_plus_one.add((endpoint, statement))
+            slow_query_logger.warning(
+                "possible N+1: endpoint=%s ran %d times: %s",
+                endpoint,
+                count,
+                " ".join(statement.split()),
+            )
+
+    if app.config["SERVER_TIMING"] or app.debug:
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats["seconds"] * 1000:.1f};desc="{stats["count"]} queries", '
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+    return response
+
 
 ALLOWED_EXTENSIONS = {"pdf", "doc", "docx", "jpg", "jpeg", "png"}
 
@@ -22,28 +545,319 @@ def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+class TTLCache:
+    # Small thread-safe, process-local cache with per-entry expiry and LRU
+    # eviction once maxsize entries are held.
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def pop(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class PasswordHasherBusy(ServiceUnavailable):
+    description = "The server is busy verifying other logins. Please try again shortly."
+
+
+password_hash_pools = {}
+password_hash_pool_lock = threading.Lock()
+password_hash_slots = threading.BoundedSemaphore(
+    app.config["PASSWORD_HASH_MAX_PENDING"]
+)
+
+
+def password_hash_mp_context():
+    # Server workers are multi-threaded, and forking one copies whatever locks
+    # its other threads hold. Start hashers from a clean forkserver instead,
+    # or spawn them where forkserver is unavailable.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def get_password_hash_pool(workers_key="PASSWORD_HASH_WORKERS"):
+    with password_hash_pool_lock:
+        if workers_key not in password_hash_pools:
+            password_hash_pools[workers_key] = ProcessPoolExecutor(
+                max_workers=app.config[workers_key],
+                mp_context=password_hash_mp_context(),
+            )
+        return password_hash_pools[workers_key]
+
+
+def run_password_task(func, *args, **kwargs):
+    if app.config["PASSWORD_HASH_WORKERS"] <= 0:
+        return func(*args, **kwargs)
+    if not password_hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        return get_password_hash_pool().submit(func, *args, **kwargs).result()
+    finally:
+        password_hash_slots.release()
+
+
+def hash_password(password):
+    return run_password_task(
+        generate_password_hash,
+        password,
+        method=app.config["PASSWORD_HASH_METHOD"],
+        salt_length=app.config["PASSWORD_SALT_LENGTH"],
+    )
+
+
+def hash_passwords(passwords):
+    # Bulk variant for imports. It runs on the separate IMPORT_HASH_WORKERS
+    # pool, so it neither waits for nor takes the login pool's slots.
+    hasher = partial(
+        generate_password_hash,
+        method=app.config["PASSWORD_HASH_METHOD"],
+        salt_length=app.config["PASSWORD_SALT_LENGTH"],
+    )
+    if app.config["IMPORT_HASH_WORKERS"] <= 0:
+        return [hasher(password) for password in passwords]
+    pool = get_password_hash_pool("IMPORT_HASH_WORKERS")
+    return list(pool.map(hasher, passwords, chunksize=16))
+
+
+@lru_cache(maxsize=8)
+def password_hash_prefix(method, salt_length):
+    # werkzeug expands short method names ("scrypt") to their full parameter
+    # string, so hash a throwaway value once to learn the canonical prefix.
+    method, salt = generate_password_hash("", method, salt_length).split("$")[:2]
+    return method, len(salt)
+
+
+def password_needs_rehash(pwhash):
+    parts = pwhash.split("$")
+    if len(parts) != 3:
+        return True
+    return (parts[0], len(parts[1])) != password_hash_prefix(
+        app.config["PASSWORD_HASH_METHOD"], app.config["PASSWORD_SALT_LENGTH"]
+    )
+
+
+class MemoryRateLimitStore:
+    # Per key, [window number, hits in that window, hits in the one before],
+    # with LRU eviction once RATE_LIMIT_MAX_KEYS keys are tracked.
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return tuple(entry) if entry else None
+
+    def hit(self, key, window, expires_at):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = [window, 0, 0]
+            elif entry[0] != window:
+                entry[2] = entry[1] if entry[0] == window - 1 else 0
+                entry[0], entry[1] = window, 0
+            entry[1] += 1
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def reset(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class SQLiteRateLimitStore:
+    # Same counters in a small SQLite file, so every worker process on the
+    # host sees the same attempts. Kept apart from the application database
+    # so throttling never waits on its write lock.
+    def __init__(self, path, sweep_interval):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.next_sweep = 0
+        self.local = threading.local()
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY,"
+                " window INTEGER NOT NULL, current INTEGER NOT NULL,"
+                " previous INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.local.conn = conn
+        return conn
+
+    def get(self, key):
+        return (
+            self.connect()
+            .execute(
+                "SELECT window, current, previous FROM rate_limit WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+
+    def hit(self, key, window, expires_at):
+        conn = self.connect()
+        # SET expressions all see the row as it was before the update.
+        conn.execute(
+            "INSERT INTO rate_limit VALUES (?, ?, 1, 0, ?)"
+            " ON CONFLICT(key) DO UPDATE SET"
+            " previous = CASE WHEN window = excluded.window THEN previous"
+            " WHEN window = excluded.window - 1 THEN current ELSE 0 END,"
+            " current = CASE WHEN window = excluded.window THEN current + 1"
+            " ELSE 1 END,"
+            " window = excluded.window, expires_at = excluded.expires_at",
+            (key, window, expires_at),
+        )
+        now = time.time()
+        if now >= self.next_sweep:
+            self.next_sweep = now + self.sweep_interval
+            conn.execute("DELETE FROM rate_limit WHERE expires_at < ?", (now,))
+
+    def reset(self, key):
+        self.connect().execute("DELETE FROM rate_limit WHERE key = ?", (key,))
+
+
+class RateLimiter:
+    # Sliding-window counter: the hits in the previous fixed window are
+    # weighted by how much of it still overlaps the sliding window, which
+    # needs two counters per key instead of a timestamp per attempt.
+    def __init__(self, store):
+        self.store = store
+
+    def retry_after(self, scope, key):
+        # Seconds until the estimate drops back under the limit, or 0.
+        limit, window = app.config["RATE_LIMITS"][scope]
+        entry = self.store.get(f"{scope}:{key}")
+        if entry is None:
+            return 0
+        number, current, previous = entry
+        now = time.time()
+        elapsed = now % window
+        if number == now // window - 1:
+            # The key's last window is now the weighted previous one.
+            current, previous = 0, current
+        elif number != now // window:
+            return 0
+        if current + previous * (1 - elapsed / window) < limit:
+            return 0
+        if current < limit:
+            wait = window * (1 - (limit - current) / previous) - elapsed
+        else:
+            # Only falls under once this window's hits are the previous ones.
+            wait = window - elapsed + window * (1 - limit / current)
+        return max(1, math.ceil(wait))
+
+    def hit(self, scope, key):
+        window = app.config["RATE_LIMITS"][scope][1]
+        now = time.time()
+        number = int(now // window)
+        self.store.hit(f"{scope}:{key}", number, (number + 2) * window)
+        metrics.inc("cosa_rate_limit_failures_total", scope=scope)
+
+    def reset(self, scope, key):
+        self.store.reset(f"{scope}:{key}")
+
+
+if app.config["RATE_LIMIT_DB"]:
+    rate_limiter = RateLimiter(
+        SQLiteRateLimitStore(
+            app.config["RATE_LIMIT_DB"], app.config["RATE_LIMIT_SWEEP_INTERVAL"]
+        )
+    )
+else:
+    rate_limiter = RateLimiter(MemoryRateLimitStore(app.config["RATE_LIMIT_MAX_KEYS"]))
+metrics.describe(
+    "cosa_rate_limit_failures_total",
+    "counter",
+    "Failed login and 2FA attempts counted towards rate limits.",
+)
+metrics.describe(
+    "cosa_rate_limit_rejections_total",
+    "counter",
+    "Login and 2FA attempts rejected for exceeding a rate limit.",
+)
+
+
+def throttled(scopes):
+    # scopes maps each rate limit scope to the key it is counted under.
+    # Returns the longest Retry-After of the limits exceeded, or 0.
+    retry_after = 0
+    for scope, key in scopes.items():
+        wait = rate_limiter.retry_after(scope, key)
+        if wait:
+            metrics.inc("cosa_rate_limit_rejections_total", scope=scope)
+            retry_after = max(retry_after, wait)
+    return retry_after
+
+
 USER_ROLES = ["student", "coordinator", "employer", "admin"]
+APPLICATION_STATUSES = ["Under Review", "Accepted", "Rejected"]
+REPORT_TYPES = {
+    "workterm": "Work Term Report",
+    "progress": "Progress Report",
+    "final": "Final Report",
+}
+# Academic terms as (first month, first month of the next term).
+TERMS = {"winter": (1, 5), "summer": (5, 9), "fall": (9, 13)}
 
 
 class User(db.Model):
+    __table_args__ = (db.Index("ix_user_role_is_active", "role", "is_active"),)
+
     id = db.Column(db.Integer, primary_key=True)
     role = db.Column(db.String(50), nullable=False)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     name = db.Column(db.String(120))
     student_id = db.Column(db.String(50))
-    password_hash = db.Column(db.String(128), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    password_hash = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     two_factor_secret = db.Column(db.String(32))
-    two_factor_enabled = db.Column(db.Boolean, default=False)
+    two_factor_enabled = db.Column(db.Boolean, default=False, index=True)
     two_factor_initiated = db.Column(db.Boolean, default=False)
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, default=True, index=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not run_password_task(check_password_hash, self.password_hash, password):
+            return False
+        if password_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
 
     def generate_two_factor_secret(self):
         if not self.two_factor_secret:
@@ -56,54 +870,2354 @@ class User(db.Model):
         totp = pyotp.TOTP(self.two_factor_secret)
         return totp.provisioning_uri(self.email, issuer_name="COSA")
 
-    def verify_two_factor(self, code):
-        if not self.two_factor_secret:
-            return False
-        totp = pyotp.TOTP(self.two_factor_secret)
-        return totp.verify(code)
+    def verify_two_factor(self, code):
+        if not self.two_factor_secret:
+            return False
+        totp = pyotp.TOTP(self.two_factor_secret)
+        return totp.verify(code)
+
+
+class UserSession(db.Model):
+    # Server-side session store. id is the SHA-256 of the cookie token, so
+    # rows can't be replayed as cookies; user_id finds a user's sessions when
+    # they have to be revoked.
+    id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), index=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class JobPosting(db.Model):
+    __table_args__ = (
+        db.Index("ix_job_posting_employer_id_deadline", "employer_id", "deadline"),
+        db.Index("ix_job_posting_job_type_deadline", "job_type", "deadline"),
+        db.Index("ix_job_posting_location_deadline", "location", "deadline"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    employer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    job_type = db.Column(db.String(50), nullable=False)
+    deadline = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class Blob(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class Report(db.Model):
+    __table_args__ = (
+        db.Index("ix_report_type_submitted_at", "report_type", "submitted_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(
+        db.Integer, db.ForeignKey("user.id"), nullable=False, index=True
+    )
+    pdf_filename = db.Column(db.String(200))
+    blob_hash = db.Column(db.String(64), db.ForeignKey("blob.sha256"), index=True)
+    report_type = db.Column(db.String(50), nullable=False)
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processing_status = db.Column(db.String(20), default="pending")
+    processing_error = db.Column(db.String(255))
+    page_count = db.Column(db.Integer)
+    text_content = db.Column(db.Text)
+    thumbnail_hash = db.Column(db.String(64), db.ForeignKey("blob.sha256"))
+
+
+class Document(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    owner_id = db.Column(
+        db.Integer, db.ForeignKey("user.id"), nullable=False, index=True
+    )
+    document_type = db.Column(db.String(50))
+    filename = db.Column(db.String(200), nullable=False)
+    blob_hash = db.Column(
+        db.String(64), db.ForeignKey("blob.sha256"), nullable=False, index=True
+    )
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class Job(db.Model):
+    __table_args__ = (db.Index("ix_job_status_available_at", "status", "available_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime)
+    error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class DataImport(db.Model):
+    # A file uploaded to /import_data, imported by the "import_data" job.
+    # Rejected rows are written to a CSV error report next to the upload.
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    format = db.Column(db.String(10), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    imported = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255))
+    created_by = db.Column(db.Integer, db.ForeignKey("user.id"))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+
+class Reminder(db.Model):
+    # Materialised reminders. audience is "student:<id>" for one student or
+    # "students" for reminders shared by every student, so a student's page is
+    # one indexed IN lookup. key identifies the source record for upserts.
+    __table_args__ = (db.Index("ix_reminder_audience_due_at", "audience", "due_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), unique=True, nullable=False)
+    audience = db.Column(db.String(50), nullable=False)
+    kind = db.Column(db.String(30), nullable=False)
+    message = db.Column(db.String(255), nullable=False)
+    due_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class CoopApplication(db.Model):
+    # A student may apply once per term; (user_id, id) serves "my applications"
+    # as an index range read, and (term, student_year, status) covers the
+    # analytics aggregates.
+    __table_args__ = (
+        db.Index("ix_coop_application_status_id", "status", "id"),
+        db.Index("ix_coop_application_user_id_id", "user_id", "id"),
+        db.Index("ux_coop_application_user_id_term", "user_id", "term", unique=True),
+        db.Index(
+            "ix_coop_application_term_student_year_status",
+            "term",
+            "student_year",
+            "status",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    term = db.Column(db.String(20))
+    full_name = db.Column(db.String(120), nullable=False, index=True)
+    address = db.Column(db.String(255), nullable=False)
+    dob = db.Column(db.Date, nullable=False)
+    student_number = db.Column(db.String(50), nullable=False, index=True)
+    student_year = db.Column(db.Integer, nullable=False)
+    linkedin = db.Column(db.String(255), nullable=False, index=True)
+    status = db.Column(db.String(50), default="Under Review")
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    def set_status(self, new_status, changed_by=None):
+        db.session.add(
+            ApplicationEvent(
+                application_id=self.id,
+                user_id=self.user_id,
+                old_status=self.status,
+                new_status=new_status,
+                changed_by=changed_by,
+            )
+        )
+        self.status = new_status
+
+    def update_status(self, new_status, changed_by=None):
+        self.set_status(new_status, changed_by)
+        db.session.commit()
+        status_events.notify()
+
+
+class ApplicationEvent(db.Model):
+    # Append-only log of application status changes. (user_id, id) lets a
+    # student's event stream resume after the last event id it saw.
+    __table_args__ = (db.Index("ix_application_event_user_id_id", "user_id", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(
+        db.Integer, db.ForeignKey("coop_application.id"), nullable=False, index=True
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    old_status = db.Column(db.String(50))
+    new_status = db.Column(db.String(50), nullable=False)
+    changed_by = db.Column(db.Integer, db.ForeignKey("user.id"))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# External-content FTS5 indexes, as (content table, columns, tokenizer). The
+# trigram tokenizer keeps the old case-insensitive substring semantics for
+# application search; job postings use word tokens with stemming so results
+# can be ranked. Triggers keep each index in sync with every insert, update
+# and delete on its content table.
+FTS_INDEXES = {
+    "coop_application_fts": ("coop_application", ["full_name", "linkedin"], "trigram"),
+    "job_posting_fts": (
+        "job_posting",
+        ["title", "description", "location"],
+        "porter unicode61",
+    ),
+}
+
+# The trigram tokenizer cannot match terms shorter than three characters.
+FTS_MIN_TERM_LENGTH = 3
+
+
+def fts_ddl(name, content, columns, tokenize):
+    column_list = ", ".join(columns)
+    old_values = ", ".join("old." + column for column in columns)
+    new_values = ", ".join("new." + column for column in columns)
+    insert_new = f"""INSERT INTO {name}(rowid, {column_list})
+        VALUES (new.id, {new_values});"""
+    delete_old = f"""INSERT INTO {name}({name}, rowid, {column_list})
+        VALUES ('delete', old.id, {old_values});"""
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5(
+        {column_list},
+        content='{content}', content_rowid='id', tokenize='{tokenize}'
+    )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {content} BEGIN
+        {insert_new}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {content} BEGIN
+        {delete_old}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_au
+    AFTER UPDATE OF {column_list} ON {content} BEGIN
+        {delete_old}
+        {insert_new}
+    END""",
+    ]
+
+
+def fts_enabled():
+    return db.engine.dialect.name == "sqlite"
+
+
+@event.listens_for(db.metadata, "after_drop")
+def drop_fts_indexes(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        for name in FTS_INDEXES:
+            connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+class SchemaMigration(db.Model):
+    # One row per applied entry of MIGRATIONS.
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# Versioned schema changes as version -> (name, upgrade, downgrade), applied
+# in order by "flask --app master migrate up" and recorded in
+# schema_migration. Upgrades are idempotent, so a database created before
+# migrations existed is adopted by running all of them. downgrade is None
+# for changes that can't be undone.
+MIGRATIONS = {}
+
+
+def migration(version, name, downgrade=None):
+    def register(upgrade):
+        MIGRATIONS[version] = (name, upgrade, downgrade)
+        return upgrade
+
+    return register
+
+
+def applied_migrations():
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    return {row.version: row for row in db.session.scalars(db.select(SchemaMigration))}
+
+
+def apply_migrations(target=None):
+    applied = applied_migrations()
+    done = []
+    for version in sorted(MIGRATIONS):
+        if version in applied or (target is not None and version > target):
+            continue
+        name, upgrade, _ = MIGRATIONS[version]
+        upgrade()
+        db.session.add(SchemaMigration(version=version, name=name))
+        db.session.commit()
+        done.append(version)
+    return done
+
+
+def rollback_migrations(target):
+    applied = applied_migrations()
+    pending = [version for version in sorted(applied, reverse=True) if version > target]
+    for version in pending:
+        name, _, downgrade = MIGRATIONS.get(
+            version, (applied[version].name, None, None)
+        )
+        if downgrade is None:
+            raise ValueError(f"Migration {version} ({name}) can't be rolled back.")
+    for version in pending:
+        MIGRATIONS[version][2]()
+        db.session.execute(
+            db.delete(SchemaMigration).where(SchemaMigration.version == version)
+        )
+        db.session.commit()
+    return pending
+
+
+def create_index_online(index):
+    # PostgreSQL builds the index CONCURRENTLY, without blocking writes, which
+    # can't run inside a transaction. SQLite has no equivalent, but in WAL
+    # mode readers carry on during the build and writers wait up to
+    # busy_timeout.
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect))
+        if conn.dialect.name == "postgresql":
+            ddl = re.sub(
+                r"^CREATE (UNIQUE )?INDEX", r"CREATE \1INDEX CONCURRENTLY", ddl
+            )
+        conn.execute(text(ddl))
+
+
+def drop_index_online(index):
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        ddl = str(DropIndex(index, if_exists=True).compile(dialect=conn.dialect))
+        if conn.dialect.name == "postgresql":
+            ddl = ddl.replace("DROP INDEX", "DROP INDEX CONCURRENTLY", 1)
+        conn.execute(text(ddl))
+
+
+def add_missing_columns(table, names):
+    existing = {
+        column["name"] for column in db.inspect(db.engine).get_columns(table.name)
+    }
+    with db.engine.begin() as conn:
+        for name in names:
+            if name in existing:
+                continue
+            column = table.c[name]
+            ddl = (
+                f"ALTER TABLE {table.name} ADD COLUMN {name} "
+                f"{column.type.compile(dialect=conn.dialect)}"
+            )
+            if column.server_default is not None:
+                ddl += f" NOT NULL DEFAULT {column.server_default.arg}"
+            conn.execute(text(ddl))
+
+
+@migration(1, "create_tables")
+def create_tables():
+    db.create_all()
+
+
+@migration(2, "link_applications_to_users")
+def migrate_coop_applications():
+    # Bring a coop_application table from before applications were linked to
+    # users up to date, then link unowned rows to the student with a matching
+    # student number, falling back to an unambiguous name match. Idempotent.
+    columns = {
+        column["name"]
+        for column in db.inspect(db.engine).get_columns("coop_application")
+    }
+    if "user_id" not in columns:
+        if db.engine.dialect.name == "sqlite":
+            rebuild_sqlite_table(CoopApplication.__table__, columns)
+        else:
+            add_missing_columns(
+                CoopApplication.__table__, ["user_id", "term", "version"]
+            )
+
+    def owner(match):
+        return (
+            db.select(db.func.min(User.id))
+            .where(User.role == "student", match)
+            .having(db.func.count() == 1)
+            .scalar_subquery()
+        )
+
+    linked = db.session.execute(
+        db.update(CoopApplication)
+        .where(CoopApplication.user_id.is_(None))
+        .values(
+            user_id=db.func.coalesce(
+                owner(User.student_id == CoopApplication.student_number),
+                owner(User.name == CoopApplication.full_name),
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    unlinked = db.session.scalar(
+        db.select(db.func.count()).where(CoopApplication.user_id.is_(None))
+    )
+    db.session.commit()
+    return linked.rowcount - unlinked, unlinked
+
+
+def rebuild_sqlite_table(table, existing_columns):
+    # SQLite can't drop a constraint in place, so follow its documented
+    # rebuild order: create the current definition as a new table, copy the
+    # rows over (keeping ids, so FTS rowids stay valid), drop the old table and
+    # rename the new one into place. Renaming the old table aside instead
+    # would make SQLite repoint other tables' foreign keys at the copy.
+    # Migration 5 restores the FTS triggers.
+    new_table = table.to_metadata(db.metadata, name=f"{table.name}_new")
+    db.metadata.remove(new_table)
+    copied = ", ".join(c.name for c in table.columns if c.name in existing_columns)
+    with db.engine.connect() as conn:
+        # Takes effect outside a transaction only, and stops DROP TABLE from
+        # deleting or checking referencing rows.
+        foreign_keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        conn.commit()
+        try:
+            with conn.begin():
+                conn.execute(CreateTable(new_table))
+                conn.execute(
+                    text(
+                        f"INSERT INTO {new_table.name} ({copied}) "
+                        f"SELECT {copied} FROM {table.name}"
+                    )
+                )
+                conn.execute(text(f"DROP TABLE {table.name}"))
+                conn.execute(
+                    text(f"ALTER TABLE {new_table.name} RENAME TO {table.name}")
+                )
+                for index in table.indexes:
+                    index.create(conn)
+        finally:
+            conn.exec_driver_sql(f"PRAGMA foreign_keys = {foreign_keys}")
+            conn.commit()
+
+
+@migration(3, "report_storage_columns")
+def add_report_storage_columns():
+    # Columns added to report by content-addressed storage and background
+    # processing. create_all() doesn't alter tables that already exist.
+    add_missing_columns(
+        Report.__table__,
+        [
+            "blob_hash",
+            "processing_status",
+            "processing_error",
+            "page_count",
+            "text_content",
+            "thumbnail_hash",
+        ],
+    )
+
+
+def drop_declared_indexes():
+    # Unique indexes enforce constraints the app relies on, so they stay.
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if not index.unique:
+                drop_index_online(index)
+
+
+@migration(4, "declared_indexes", downgrade=drop_declared_indexes)
+def create_declared_indexes():
+    # Indexes declared on the models before migrations existed. create_all()
+    # only adds indexes for tables it creates, so older databases lack some.
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            create_index_online(index)
+
+
+def drop_fts_tables():
+    if not fts_enabled():
+        return
+    with db.engine.begin() as conn:
+        for name in FTS_INDEXES:
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {name}_{suffix}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+@migration(5, "full_text_search", downgrade=drop_fts_tables)
+def create_fts_indexes():
+    if not fts_enabled():
+        return
+    with db.engine.begin() as conn:
+        for name, (content, columns, tokenize) in FTS_INDEXES.items():
+            existed = conn.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ),
+                {"name": name},
+            ).first()
+            for statement in fts_ddl(name, content, columns, tokenize):
+                conn.execute(text(statement))
+            if not existed:
+                conn.execute(text(f"INSERT INTO {name}({name}) VALUES ('rebuild')"))
+
+
+@migration(
+    6,
+    "data_imports",
+    downgrade=lambda: DataImport.__table__.drop(db.engine, checkfirst=True),
+)
+def create_data_import_table():
+    DataImport.__table__.create(db.engine, checkfirst=True)
+
+
+@app.cli.group("migrate", help="Apply, roll back and inspect schema migrations.")
+def migrate_command():
+    pass
+
+
+@migrate_command.command("status")
+def migrate_status_command():
+    applied = applied_migrations()
+    for version in sorted(set(MIGRATIONS) | set(applied)):
+        name = MIGRATIONS[version][0] if version in MIGRATIONS else "(unknown)"
+        row = applied.get(version)
+        state = f"applied {row.applied_at:%Y-%m-%d %H:%M}" if row else "pending"
+        click.echo(f"{version:4d}  {name:48}  {state}")
+
+
+@migrate_command.command("up")
+@click.option("--to", "target", type=int, help="Stop after this version.")
+def migrate_up_command(target):
+    done = apply_migrations(target)
+    for version in done:
+        click.echo(f"Applied {version} {MIGRATIONS[version][0]}.")
+    if not done:
+        click.echo("Database is up to date.")
+
+
+@migrate_command.command("down")
+@click.option("--to", "target", type=int, required=True, help="Version to keep.")
+def migrate_down_command(target):
+    try:
+        undone = rollback_migrations(target)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for version in undone:
+        click.echo(f"Rolled back {version} {MIGRATIONS[version][0]}.")
+    if not undone:
+        click.echo("Nothing to roll back.")
+
+
+# Streaming or side-effecting GET endpoints check-query-plans doesn't visit,
+# and URLs with query strings it visits on top of every argument-free GET.
+QUERY_PLAN_SKIP_ENDPOINTS = {"static", "logout", "application_events"}
+QUERY_PLAN_SAMPLE_URLS = [
+    "/jobs?q=developer",
+    "/jobs?job_type=remote&location=Toronto",
+    "/application_review?name=smith&status=Under+Review",
+    "/dashboard/admin?role=student&q=smith",
+    "/analytics?term=fall-2025",
+]
+
+
+@app.cli.command("check-query-plans")
+def check_query_plans_command():
+    # Visits every page as each role and reports the statements whose plan
+    # scans a whole table. Exits 1 if any do, so it can gate CI.
+    app.config["QUERY_PLAN_CHECK"] = True
+    urls = [
+        rule.rule
+        for rule in app.url_map.iter_rules()
+        if "GET" in rule.methods
+        and not rule.arguments
+        and rule.endpoint not in QUERY_PLAN_SKIP_ENDPOINTS
+    ] + QUERY_PLAN_SAMPLE_URLS
+    client = app.test_client()
+    for role in [None] + USER_ROLES:
+        user = None
+        if role:
+            user = db.session.scalar(db.select(User).where(User.role == role).limit(1))
+            if user is None:
+                click.echo(f"No {role} user, skipping {role} pages.", err=True)
+                continue
+        with client.session_transaction() as client_session:
+            client_session.clear()
+            if user:
+                client_session.update(
+                    user_id=user.id, role=user.role, username=user.username
+                )
+        for url in urls:
+            client.get(url).close()
+    for (endpoint, statement), tables in sorted(full_table_scans.items()):
+        click.echo(f"{endpoint}: full scan of {', '.join(tables)}")
+        click.echo(f"    {' '.join(statement.split())}")
+    if full_table_scans:
+        raise SystemExit(1)
+    click.echo("No full table scans.")
+
+
+def like_pattern(term):
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return "%{}%".format(escaped)
+
+
+def fts_phrase(column, term):
+    return '{} : "{}"'.format(column, term.replace('"', '""'))
+
+
+def application_criteria(name=None, email=None, student_number=None, status=None):
+    criteria = []
+    if student_number:
+        criteria.append(CoopApplication.student_number == student_number)
+    if status:
+        criteria.append(CoopApplication.status == status)
+
+    fts_terms = []
+    for column, term in (("full_name", name), ("linkedin", email)):
+        if not term:
+            continue
+        if fts_enabled() and len(term) >= FTS_MIN_TERM_LENGTH:
+            fts_terms.append(fts_phrase(column, term))
+        else:
+            criteria.append(
+                getattr(CoopApplication, column).ilike(like_pattern(term), escape="\\")
+            )
+    if fts_terms:
+        matches = text(
+            "SELECT rowid FROM coop_application_fts WHERE coop_application_fts MATCH :q"
+        ).bindparams(q=" AND ".join(fts_terms))
+        criteria.append(CoopApplication.id.in_(matches.columns(rowid=db.Integer)))
+    return criteria
+
+
+def search_applications(
+    name=None, email=None, student_number=None, status=None, after_id=None, limit=None
+):
+    limit = limit or app.config["APPLICATION_PAGE_SIZE"]
+    query = CoopApplication.query.filter(
+        *application_criteria(name, email, student_number, status)
+    )
+    if after_id:
+        query = query.filter(CoopApplication.id > after_id)
+
+    rows = query.order_by(CoopApplication.id).limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def decide_applications(
+    new_status, expected_versions=None, criteria=None, changed_by=None
+):
+    # Apply one coordinator decision to many applications with set-based
+    # UPDATEs in a single transaction. Only applications still under review are
+    # touched, and when the caller saw a specific version of a row it must
+    # still be at that version, so a concurrent decision by another
+    # coordinator is reported as a conflict instead of being overwritten.
+    table = CoopApplication.__table__
+    conditions = [table.c.status == "Under Review"] + list(criteria or [])
+    statement = (
+        db.update(table)
+        .values(status=new_status, version=table.c.version + 1)
+        .returning(table.c.id, table.c.user_id)
+    )
+
+    results = {}
+    events = []
+
+    def record(rows):
+        for app_id, user_id in rows:
+            results[app_id] = "updated"
+            events.append(
+                {
+                    "application_id": app_id,
+                    "user_id": user_id,
+                    "old_status": "Under Review",
+                    "new_status": new_status,
+                    "changed_by": changed_by,
+                    "created_at": datetime.utcnow(),
+                }
+            )
+
+    if expected_versions is None:
+        record(db.session.execute(statement.where(*conditions)))
+        commit_status_events(events)
+        return results
+
+    pairs = list(expected_versions.items())
+    batch = app.config["BULK_DECISION_BATCH_SIZE"]
+    for i in range(0, len(pairs), batch):
+        matched = db.tuple_(table.c.id, table.c.version).in_(pairs[i : i + batch])
+        record(db.session.execute(statement.where(matched, *conditions)))
+
+    missing = [app_id for app_id in expected_versions if app_id not in results]
+    current = {}
+    for i in range(0, len(missing), batch):
+        current.update(
+            db.session.query(CoopApplication.id, CoopApplication.version).filter(
+                CoopApplication.id.in_(missing[i : i + batch])
+            )
+        )
+    for app_id in missing:
+        if app_id not in current:
+            results[app_id] = "not_found"
+        elif current[app_id] != expected_versions[app_id]:
+            results[app_id] = "conflict"
+        else:
+            results[app_id] = "already_decided"
+    commit_status_events(events)
+    return results
+
+
+def commit_status_events(events):
+    if events:
+        db.session.execute(db.insert(ApplicationEvent), events)
+    db.session.commit()
+    if events:
+        status_events.notify()
+
+
+def application_events_after(last_id, user_id=None, limit=None):
+    query = db.session.query(
+        ApplicationEvent.id,
+        ApplicationEvent.application_id,
+        ApplicationEvent.user_id,
+        ApplicationEvent.new_status,
+        ApplicationEvent.created_at,
+    ).filter(ApplicationEvent.id > last_id)
+    if user_id is not None:
+        query = query.filter(ApplicationEvent.user_id == user_id)
+    return query.order_by(ApplicationEvent.id).limit(limit).all()
+
+
+class StatusEventBroker:
+    # In-process fan-out of application status events to connected students.
+    # A single dispatcher thread per process tails application_event (woken
+    # early by local commits, otherwise every EVENT_POLL_INTERVAL so decisions
+    # made in other processes arrive too) and hands new rows to per-client
+    # queues. Waiting clients cost one queue each and no database queries.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def subscribe(self, user_id):
+        subscriber = queue.Queue(maxsize=app.config["EVENT_QUEUE_SIZE"])
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(subscriber)
+            if self.thread is None:
+                with app.app_context():
+                    last_id = db.session.scalar(
+                        db.select(db.func.max(ApplicationEvent.id))
+                    )
+                self.thread = threading.Thread(
+                    target=self.run, args=(last_id or 0,), daemon=True
+                )
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(user_id, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self.subscribers.pop(user_id, None)
+
+    def notify(self):
+        self.wakeup.set()
+
+    def publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(event["user_id"], ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # The client has stopped reading; it catches up from its
+                # Last-Event-ID when the browser reconnects.
+                pass
+
+    def run(self, last_id):
+        while True:
+            self.wakeup.wait(app.config["EVENT_POLL_INTERVAL"])
+            self.wakeup.clear()
+            try:
+                with app.app_context():
+                    events = application_events_after(last_id, limit=1000)
+            except Exception:
+                app.logger.exception("Failed to read application events")
+                continue
+            for event in events:
+                last_id = event.id
+                if event.user_id is not None:
+                    self.publish(event._asdict())
+
+
+status_events = StatusEventBroker()
+event_stream_slots = threading.BoundedSemaphore(app.config["EVENT_MAX_STREAMS"])
+
+
+def sse_message(event):
+    data = {
+        "application_id": event["application_id"],
+        "status": event["new_status"],
+        "created_at": event["created_at"].isoformat(),
+    }
+    return f"id: {event['id']}\nevent: status\ndata: {json.dumps(data)}\n\n"
+
+
+USER_SORT_COLUMNS = {
+    "id": User.id,
+    "username": User.username,
+    "created_at": User.created_at,
+}
+USER_SORT_TYPES = {"id": int, "username": str, "created_at": datetime}
+USER_LIST_COLUMNS = (
+    User.id,
+    User.username,
+    User.name,
+    User.email,
+    User.role,
+    User.is_active,
+    User.two_factor_enabled,
+    User.created_at,
+)
+
+
+def encode_cursor(values):
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(token, types):
+    # Returns the cursor's values converted to types, or None for a malformed
+    # cursor, which callers treat as a request for the first page.
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            return None
+        return [cursor_value(value, kind) for value, kind in zip(values, types)]
+    except (TypeError, ValueError):
+        return None
+
+
+def cursor_value(value, kind):
+    if kind is datetime:
+        return datetime.fromisoformat(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise TypeError(f"Expected {kind.__name__} in cursor.")
+    return value
+
+
+def user_list_filters():
+    filters = {
+        "role": request.args.get("role", ""),
+        "active": request.args.get("active", ""),
+        "two_factor": request.args.get("two_factor", ""),
+        "sort": request.args.get("sort", "id"),
+        "order": request.args.get("order", "asc"),
+    }
+    if filters["role"] not in USER_ROLES:
+        filters["role"] = ""
+    for flag in ("active", "two_factor"):
+        if filters[flag] not in ("0", "1"):
+            filters[flag] = ""
+    if filters["sort"] not in USER_SORT_COLUMNS:
+        filters["sort"] = "id"
+    if filters["order"] not in ("asc", "desc"):
+        filters["order"] = "asc"
+    return filters
+
+
+def list_users(filters, after=None, limit=None):
+    # Keyset pagination over (sort column, id), selecting only the columns
+    # the listing templates render.
+    limit = limit or app.config["USER_PAGE_SIZE"]
+    sort_column = USER_SORT_COLUMNS[filters["sort"]]
+    descending = filters["order"] == "desc"
+
+    query = db.session.query(*USER_LIST_COLUMNS)
+    if filters["role"]:
+        query = query.filter(User.role == filters["role"])
+    if filters["active"]:
+        query = query.filter(User.is_active == (filters["active"] == "1"))
+    if filters["two_factor"]:
+        query = query.filter(User.two_factor_enabled == (filters["two_factor"] == "1"))
+
+    cursor = None
+    if after:
+        cursor = decode_cursor(after, (USER_SORT_TYPES[filters["sort"]], int))
+    if cursor:
+        value, last_id = cursor
+        key = db.tuple_(sort_column, User.id)
+        query = query.filter(
+            key < db.tuple_(value, last_id)
+            if descending
+            else key > db.tuple_(value, last_id)
+        )
+
+    if descending:
+        query = query.order_by(sort_column.desc(), User.id.desc())
+    else:
+        query = query.order_by(sort_column, User.id)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([getattr(last, filters["sort"]), last.id])
+    return rows[:limit], next_cursor
+
+
+def user_counts():
+    counts = {
+        "total": 0,
+        "active": 0,
+        "inactive": 0,
+        "roles": {role: 0 for role in USER_ROLES},
+    }
+    for role, is_active, count in db.session.query(
+        User.role, User.is_active, db.func.count(User.id)
+    ).group_by(User.role, User.is_active):
+        counts["total"] += count
+        counts["active" if is_active else "inactive"] += count
+        counts["roles"][role] = counts["roles"].get(role, 0) + count
+    return counts
+
+
+JOB_LIST_COLUMNS = (
+    JobPosting.id,
+    JobPosting.title,
+    JobPosting.description,
+    JobPosting.location,
+    JobPosting.job_type,
+    JobPosting.deadline,
+)
+
+# Pages of the public job board. Keys include a generation number that
+# add_job bumps, so a new posting invalidates every cached page in this
+# process at once. Other processes pick it up when their entries expire.
+job_board_cache = TTLCache(
+    app.config["JOB_BOARD_CACHE_SIZE"], app.config["JOB_BOARD_CACHE_TTL"]
+)
+job_board_generation = 0
+
+
+def invalidate_job_board():
+    global job_board_generation
+    job_board_generation += 1
+    job_board_cache.clear()
+
+
+def list_job_postings(query, after=None, limit=None):
+    # Keyset pagination over (deadline, id), soonest deadline first.
+    limit = limit or app.config["JOB_PAGE_SIZE"]
+    cursor = decode_cursor(after, (datetime, int)) if after else None
+    if cursor:
+        key = db.tuple_(JobPosting.deadline, JobPosting.id)
+        query = query.filter(key > db.tuple_(*cursor))
+    rows = query.order_by(JobPosting.deadline, JobPosting.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([last.deadline, last.id])
+    return rows[:limit], next_cursor
+
+
+def open_job_postings(job_type="", location="", after=None):
+    key = (job_board_generation, job_type, location, after)
+    page = job_board_cache.get(key)
+    if page is None:
+        query = db.session.query(*JOB_LIST_COLUMNS).filter(
+            JobPosting.deadline > datetime.utcnow()
+        )
+        if job_type:
+            query = query.filter(JobPosting.job_type == job_type)
+        if location:
+            query = query.filter(JobPosting.location == location)
+        page = list_job_postings(query, after=after)
+        job_board_cache.set(key, page)
+    return page
+
+
+# snippet() wraps matches in these control characters so the surrounding text
+# can be HTML-escaped before they are swapped for <mark> tags.
+SNIPPET_OPEN = "\x02"
+SNIPPET_CLOSE = "\x03"
+
+
+def highlight_snippet(snippet):
+    return Markup(
+        str(escape(snippet))
+        .replace(SNIPPET_OPEN, "<mark>")
+        .replace(SNIPPET_CLOSE, "</mark>")
+    )
+
+
+def fts_match_query(terms):
+    # Every word must match; the last one as a prefix so partially typed
+    # words still find results.
+    words = re.findall(r"\w+", terms)
+    phrases = ['"{}"'.format(word) for word in words]
+    if phrases:
+        phrases[-1] += "*"
+    return " ".join(phrases)
+
+
+def search_job_postings(terms, job_type="", location="", page=1):
+    limit = app.config["JOB_PAGE_SIZE"]
+    key = (job_board_generation, "search", terms, job_type, location, page)
+    results = job_board_cache.get(key)
+    if results is not None:
+        return results
+
+    match = fts_match_query(terms)
+    if not match:
+        return [], False
+    filters = ["j.deadline > :now"]
+    params = {
+        "match": match,
+        "now": datetime.utcnow(),
+        "open": SNIPPET_OPEN,
+        "close": SNIPPET_CLOSE,
+        "limit": limit + 1,
+        "offset": (page - 1) * limit,
+    }
+    if job_type:
+        filters.append("j.job_type = :job_type")
+        params["job_type"] = job_type
+    if location:
+        filters.append("j.location = :location")
+        params["location"] = location
+
+    if fts_enabled():
+        # bm25() scores are lower for better matches; title hits weigh most.
+        rows = [
+            row._asdict()
+            for row in db.session.execute(
+                text(f"""
+                    SELECT j.id, j.title, j.location, j.job_type, j.deadline,
+                           snippet(job_posting_fts, -1, :open, :close, '…', 24)
+                               AS snippet
+                    FROM job_posting_fts
+                    JOIN job_posting AS j ON j.id = job_posting_fts.rowid
+                    WHERE job_posting_fts MATCH :match AND {" AND ".join(filters)}
+                    ORDER BY bm25(job_posting_fts, 10.0, 1.0, 3.0), j.deadline
+                    LIMIT :limit OFFSET :offset
+                    """)
+                .bindparams(db.bindparam("now", type_=db.DateTime))
+                .columns(deadline=db.DateTime),
+                params,
+            )
+        ]
+    else:
+        query = db.session.query(
+            JobPosting.id,
+            JobPosting.title,
+            JobPosting.location,
+            JobPosting.job_type,
+            JobPosting.deadline,
+            db.func.substr(JobPosting.description, 1, 200).label("snippet"),
+        ).filter(JobPosting.deadline > params["now"])
+        for word in re.findall(r"\w+", terms):
+            pattern = like_pattern(word)
+            query = query.filter(
+                db.or_(
+                    JobPosting.title.ilike(pattern, escape="\\"),
+                    JobPosting.description.ilike(pattern, escape="\\"),
+                    JobPosting.location.ilike(pattern, escape="\\"),
+                )
+            )
+        if job_type:
+            query = query.filter(JobPosting.job_type == job_type)
+        if location:
+            query = query.filter(JobPosting.location == location)
+        rows = [
+            row._asdict()
+            for row in query.order_by(JobPosting.deadline, JobPosting.id)
+            .limit(params["limit"])
+            .offset(params["offset"])
+        ]
+
+    results = (
+        [dict(row, snippet=highlight_snippet(row["snippet"])) for row in rows[:limit]],
+        len(rows) > limit,
+    )
+    job_board_cache.set(key, results)
+    return results
+
+
+def job_board_options():
+    key = (job_board_generation, "options")
+    options = job_board_cache.get(key)
+    if options is None:
+        options = {}
+        for column in (JobPosting.job_type, JobPosting.location):
+            options[column.key] = db.session.scalars(
+                db.select(column)
+                .where(JobPosting.deadline > datetime.utcnow())
+                .distinct()
+                .order_by(column)
+            ).all()
+        job_board_cache.set(key, options)
+    return options
+
+
+IMPORT_FORMATS = ["csv", "jsonl"]
+
+
+def read_import_rows(stream, fmt):
+    # Yield (line number, row dict) pairs from a binary stream without
+    # reading the whole file into memory.
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text_stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def clean_import_row(row, fields):
+    return {
+        field: ("" if row.get(field) is None else str(row.get(field)).strip())
+        for field in fields
+    }
+
+
+def validate_user_rows(chunk):
+    valid = []
+    errors = []
+    for line_number, row in chunk:
+        if row is None:
+            errors.append((line_number, "Row is not a valid record."))
+            continue
+        row = clean_import_row(
+            row, ["username", "email", "password", "role", "name", "student_id"]
+        )
+        missing = [f for f in ("username", "email", "password", "role") if not row[f]]
+        if missing:
+            errors.append((line_number, f"Missing {', '.join(missing)}."))
+        elif row["role"] not in USER_ROLES:
+            errors.append((line_number, f"Invalid role {row['role']!r}."))
+        else:
+            valid.append((line_number, row))
+
+    usernames = [row["username"] for _, row in valid]
+    emails = [row["email"] for _, row in valid]
+    taken_usernames = set(
+        db.session.scalars(db.select(User.username).where(User.username.in_(usernames)))
+    )
+    taken_emails = set(
+        db.session.scalars(db.select(User.email).where(User.email.in_(emails)))
+    )
+
+    accepted = []
+    for line_number, row in valid:
+        if row["username"] in taken_usernames or row["email"] in taken_emails:
+            errors.append((line_number, "Username or email already exists."))
+            continue
+        taken_usernames.add(row["username"])
+        taken_emails.add(row["email"])
+        accepted.append((line_number, row))
+
+    hashes = hash_passwords([row["password"] for _, row in accepted])
+    records = [
+        {
+            "username": row["username"],
+            "email": row["email"],
+            "name": row["name"],
+            "role": row["role"],
+            "student_id": row["student_id"] if row["role"] == "student" else None,
+            "password_hash": password_hash,
+        }
+        for (_, row), password_hash in zip(accepted, hashes)
+    ]
+    return User.__table__, records, errors
+
+
+def validate_application_rows(chunk):
+    fields = [
+        "full_name",
+        "address",
+        "dob",
+        "student_number",
+        "student_year",
+        "linkedin",
+        "status",
+        "term",
+    ]
+    valid = []
+    errors = []
+    for line_number, row in chunk:
+        if row is None:
+            errors.append((line_number, "Row is not a valid record."))
+            continue
+        row = clean_import_row(row, fields)
+        missing = [f for f in fields[:-2] if not row[f]]
+        if missing:
+            errors.append((line_number, f"Missing {', '.join(missing)}."))
+            continue
+        try:
+            row["dob"] = datetime.strptime(row["dob"], "%Y-%m-%d").date()
+        except ValueError:
+            errors.append((line_number, "Invalid dob, expected YYYY-MM-DD."))
+            continue
+        if not row["student_year"].isdigit():
+            errors.append((line_number, "Invalid student_year."))
+            continue
+        row["student_year"] = int(row["student_year"])
+        row["status"] = row["status"] or "Under Review"
+        if row["status"] not in APPLICATION_STATUSES:
+            errors.append((line_number, f"Invalid status {row['status']!r}."))
+            continue
+        row["term"] = row["term"] or current_term()
+        try:
+            term_bounds(row["term"])
+        except ValueError as e:
+            errors.append((line_number, str(e)))
+            continue
+        valid.append((line_number, row))
+
+    numbers = [row["student_number"] for _, row in valid]
+    taken = set(
+        db.session.execute(
+            db.select(CoopApplication.student_number, CoopApplication.term).where(
+                CoopApplication.student_number.in_(numbers)
+            )
+        ).tuples()
+    )
+    owners = dict(
+        db.session.execute(
+            db.select(User.student_id, db.func.min(User.id))
+            .where(User.role == "student", User.student_id.in_(numbers))
+            .group_by(User.student_id)
+            .having(db.func.count() == 1)
+        ).all()
+    )
+    records = []
+    for line_number, row in valid:
+        if (row["student_number"], row["term"]) in taken:
+            errors.append(
+                (line_number, "Student number already has an application this term.")
+            )
+            continue
+        taken.add((row["student_number"], row["term"]))
+        row["user_id"] = owners.get(row["student_number"])
+        records.append(row)
+    return CoopApplication.__table__, records, errors
+
+
+IMPORT_VALIDATORS = {
+    "users": validate_user_rows,
+    "applications": validate_application_rows,
+}
+
+
+def import_records(kind, stream, fmt, on_error):
+    # Validate and insert in chunks of IMPORT_CHUNK_SIZE rows: one set-based
+    # uniqueness query per column and one executemany INSERT per chunk, each
+    # committed on its own so memory stays flat however large the file is.
+    validate = IMPORT_VALIDATORS[kind]
+    imported = failed = 0
+    rows = read_import_rows(stream, fmt)
+    while True:
+        chunk = []
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= app.config["IMPORT_CHUNK_SIZE"]:
+                break
+        if not chunk:
+            break
+        table, records, errors = validate(chunk)
+        if records:
+            db.session.execute(db.insert(table), records)
+        db.session.commit()
+        imported += len(records)
+        failed += len(errors)
+        for line_number, message in sorted(errors):
+            on_error(line_number, message)
+    return imported, failed
+
+
+@app.cli.command("import-data")
+@click.argument("kind", type=click.Choice(list(IMPORT_VALIDATORS)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS))
+@click.option("--errors", "errors_path", type=click.Path(dir_okay=False))
+@click.option(
+    "--hash-workers",
+    type=int,
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="Processes hashing imported passwords.",
+)
+def import_data_command(kind, path, fmt, errors_path, hash_workers):
+    # Runs outside the web server, so large files can use every CPU.
+    app.config["IMPORT_HASH_WORKERS"] = hash_workers
+    fmt = fmt or ("jsonl" if path.lower().endswith((".jsonl", ".json")) else "csv")
+    with open(errors_path or os.devnull, "w", newline="") as errors_file:
+        writer = csv.writer(errors_file)
+        writer.writerow(["line", "error"])
+
+        def on_error(line_number, message):
+            writer.writerow([line_number, message])
+            if not errors_path:
+                click.echo(f"line {line_number}: {message}", err=True)
+
+        with open(path, "rb") as stream:
+            imported, failed = import_records(kind, stream, fmt, on_error)
+    click.echo(f"Imported {imported} {kind}, {failed} row(s) rejected.")
+
+
+if not os.path.exists(app.config["UPLOAD_FOLDER"]):
+    os.makedirs(app.config["UPLOAD_FOLDER"])
+
+
+def blob_path(digest):
+    return os.path.join(app.config["BLOB_FOLDER"], digest[:2], digest[2:4], digest)
+
+
+# Dialect INSERT constructs that support ON CONFLICT.
+DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def store_blob(stream):
+    # Copy the upload in fixed-size chunks into a temp file next to the blob
+    # tree, hashing as we go, then rename it into its content-addressed slot.
+    # Identical content maps to the same path and is only stored once.
+    tmp_dir = os.path.join(app.config["BLOB_FOLDER"], "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(app.config["UPLOAD_CHUNK_SIZE"])
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        sha256 = digest.hexdigest()
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    blob = db.session.get(Blob, sha256)
+    if blob is None:
+        # Two uploads of the same new file can both get here. ON CONFLICT DO
+        # NOTHING lets the second insert lose quietly, and both then load the
+        # one row.
+        insert = DIALECT_INSERTS[db.session.get_bind().dialect.name]
+        db.session.execute(
+            insert(Blob)
+            .values(sha256=sha256, size=size)
+            .on_conflict_do_nothing(index_elements=["sha256"])
+        )
+        blob = db.session.get(Blob, sha256)
+    return blob
+
+
+JOB_HANDLERS = {}
+JOB_FAILURE_HANDLERS = {}
+job_wakeup = threading.Event()
+job_stop = threading.Event()
+job_workers = []
+job_workers_lock = threading.Lock()
+job_logger = logging.getLogger("cosa.jobs")
+
+
+def job_handler(kind, registry=JOB_HANDLERS):
+    def register(func):
+        registry[kind] = func
+        return func
+
+    return register
+
+
+PERIODIC_JOBS = {
+    "refresh_reminders": lambda: app.config["REMINDER_REFRESH_INTERVAL"],
+    "sweep_sessions": lambda: app.config["SESSION_SWEEP_INTERVAL"],
+}
+
+
+def enqueue_job(kind, **payload):
+    return schedule_job(kind, None, **payload)
+
+
+def schedule_job(kind, run_at, **payload):
+    job = Job(
+        kind=kind, payload=json.dumps(payload), available_at=run_at or datetime.utcnow()
+    )
+    db.session.add(job)
+    return job
+
+
+def ensure_periodic_jobs():
+    # Queue each periodic job unless one is already pending. A single
+    # INSERT ... SELECT WHERE NOT EXISTS keeps concurrent workers from racing.
+    now = datetime.utcnow()
+    for kind in PERIODIC_JOBS:
+        pending = (
+            db.select(Job.id)
+            .where(Job.kind == kind, Job.status.in_(["queued", "running"]))
+            .exists()
+        )
+        db.session.execute(
+            db.insert(Job).from_select(
+                ["kind", "payload", "status", "attempts", "available_at", "created_at"],
+                db.select(
+                    db.literal(kind),
+                    db.literal("{}"),
+                    db.literal("queued"),
+                    db.literal(0),
+                    db.literal(now),
+                    db.literal(now),
+                ).where(~pending),
+            )
+        )
+    db.session.commit()
+
+
+def notify_job_workers():
+    start_job_workers()
+    job_wakeup.set()
+
+
+def claim_job():
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=app.config["JOB_LOCK_TIMEOUT"])
+    candidates = (
+        db.session.query(Job.id)
+        .filter(
+            db.or_(
+                db.and_(Job.status == "queued", Job.available_at <= now),
+                db.and_(Job.status == "running", Job.locked_at < stale),
+            )
+        )
+        .order_by(Job.id)
+        .limit(5)
+        .all()
+    )
+    for (job_id,) in candidates:
+        # Conditional UPDATE so two workers can never claim the same job.
+        claimed = Job.query.filter(
+            Job.id == job_id,
+            db.or_(
+                Job.status == "queued",
+                db.and_(Job.status == "running", Job.locked_at < stale),
+            ),
+        ).update(
+            {
+                "status": "running",
+                "locked_at": now,
+                "attempts": Job.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+    return None
+
+
+def run_job(job):
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"No handler for job kind {job.kind!r}.")
+        handler(**json.loads(job.payload))
+        job.status = "done"
+        job.error = None
+    except Exception as e:
+        db.session.rollback()
+        job.error = str(e)[:255]
+        if job.attempts >= app.config["JOB_MAX_ATTEMPTS"]:
+            job.status = "failed"
+            failure = JOB_FAILURE_HANDLERS.get(job.kind)
+            if failure:
+                failure(**json.loads(job.payload))
+        else:
+            job.status = "queued"
+            job.available_at = datetime.utcnow() + timedelta(seconds=2**job.attempts)
+    job.locked_at = None
+    if job.kind in PERIODIC_JOBS and job.status != "queued":
+        interval = PERIODIC_JOBS[job.kind]()
+        schedule_job(job.kind, datetime.utcnow() + timedelta(seconds=interval))
+    db.session.commit()
+
+
+def process_jobs(stop_when_idle=False):
+    periodic_queued = False
+    while not job_stop.is_set():
+        with app.app_context():
+            try:
+                if not periodic_queued:
+                    ensure_periodic_jobs()
+                    periodic_queued = True
+                job = claim_job()
+                if job is not None:
+                    run_job(job)
+                    continue
+            except Exception:
+                # A transient error such as "database is locked" must not kill
+                # the worker. A job left running is reclaimed once its lock
+                # goes stale.
+                db.session.rollback()
+                job_logger.exception("job worker error, retrying")
+                job_stop.wait(app.config["JOB_ERROR_BACKOFF"])
+                continue
+        if stop_when_idle:
+            return
+        job_wakeup.wait(app.config["JOB_POLL_INTERVAL"])
+        job_wakeup.clear()
+
+
+def stop_job_workers(timeout=None):
+    # Let in-process workers finish the job they are running, then exit.
+    job_stop.set()
+    job_wakeup.set()
+    with job_workers_lock:
+        for worker in job_workers:
+            worker.join(timeout)
+        job_workers.clear()
+
+
+def start_job_workers():
+    with job_workers_lock:
+        # Replace workers that have exited, e.g. after an error in a handler.
+        job_workers[:] = [worker for worker in job_workers if worker.is_alive()]
+        while len(job_workers) < app.config["JOB_WORKERS"]:
+            worker = threading.Thread(target=process_jobs, daemon=True)
+            worker.start()
+            job_workers.append(worker)
+
+
+@app.cli.command("process-jobs")
+def process_jobs_command():
+    process_jobs()
+
+
+def report_file_path(report):
+    if report.blob_hash:
+        return blob_path(report.blob_hash)
+    # Reports uploaded before content-addressed storage live in UPLOAD_FOLDER.
+    return os.path.join(app.config["UPLOAD_FOLDER"], report.pdf_filename)
+
+
+PDF_STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\n?endstream", re.S)
+PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+PDF_TEXT_RE = re.compile(rb"\((?:[^()\\]|\\.)*\)\s*(?:Tj|'|\")|\[[^\]]*\]\s*TJ", re.S)
+PDF_STRING_RE = re.compile(rb"\(((?:[^()\\]|\\.)*)\)", re.S)
+PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"(": b"(", b")": b")"}
+
+
+def pdf_sections(data):
+    # Yield the raw file followed by every stream that inflates, so objects
+    # and text packed into compressed object/content streams are seen too.
+    yield data
+    for match in PDF_STREAM_RE.finditer(data):
+        try:
+            yield zlib.decompress(match.group(1))
+        except zlib.error:
+            continue
+
+
+def pdf_unescape(raw):
+    return re.sub(
+        rb"\\(.)", lambda m: PDF_ESCAPES.get(m.group(1), m.group(1)), raw, flags=re.S
+    )
+
+
+def inspect_pdf(data, text_limit):
+    # Best-effort structural scan without a PDF library: counts page objects
+    # and pulls literal strings from text-showing operators.
+    page_count = 0
+    text = []
+    length = 0
+    for section in pdf_sections(data):
+        page_count += len(PDF_PAGE_RE.findall(section))
+        for op in PDF_TEXT_RE.finditer(section):
+            if length >= text_limit:
+                break
+            for part in PDF_STRING_RE.findall(op.group(0)):
+                decoded = pdf_unescape(part).decode("latin-1")
+                text.append(decoded)
+                length += len(decoded)
+    return page_count, " ".join(text)[:text_limit]
+
+
+def render_pdf_thumbnail(path):
+    # Pillow can't rasterise PDFs, so use poppler's pdftoppm when installed.
+    if not shutil.which("pdftoppm"):
+        return None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prefix = os.path.join(tmp_dir, "page")
+        subprocess.run(
+            ["pdftoppm", "-png", "-f", "1", "-l", "1", "-singlefile", path, prefix],
+            check=True,
+            capture_output=True,
+            timeout=60,
+        )
+        with Image.open(prefix + ".png") as img:
+            img.thumbnail(app.config["THUMBNAIL_SIZE"])
+            buffered = BytesIO()
+            img.save(buffered, format="PNG")
+    buffered.seek(0)
+    return buffered
+
+
+@job_handler("process_report")
+def process_report(report_id):
+    report = db.session.get(Report, report_id)
+    if report is None:
+        return
+    report.processing_status = "processing"
+    db.session.commit()
+
+    with open(report_file_path(report), "rb") as f:
+        data = f.read()
+    if not data.startswith(b"%PDF-"):
+        report.processing_status = "invalid"
+        report.processing_error = "File is not a PDF document."
+        db.session.commit()
+        return
+
+    report.page_count, report.text_content = inspect_pdf(
+        data, app.config["REPORT_TEXT_LIMIT"]
+    )
+    thumbnail = render_pdf_thumbnail(report_file_path(report))
+    if thumbnail is not None:
+        report.thumbnail_hash = store_blob(thumbnail).sha256
+    report.processing_status = "ready"
+    report.processing_error = None
+    db.session.commit()
+
+
+def replace_reminders(reminders, keys):
+    # Make the reminders identified by keys match exactly the given list.
+    db.session.execute(db.delete(Reminder).where(Reminder.key.in_(list(keys))))
+    if reminders:
+        db.session.execute(db.insert(Reminder), reminders)
+
+
+def accepted_student_ids():
+    return (
+        db.select(User.id)
+        .join(CoopApplication, CoopApplication.user_id == User.id)
+        .where(User.role == "student", CoopApplication.status == "Accepted")
+    )
+
+
+def refresh_report_reminders(student_ids):
+    # One reminder per report type an accepted student hasn't submitted yet.
+    accepted = set(
+        db.session.scalars(accepted_student_ids().where(User.id.in_(student_ids)))
+    )
+    submitted = set(
+        db.session.execute(
+            db.select(Report.student_id, Report.report_type)
+            .where(Report.student_id.in_(student_ids))
+            .distinct()
+        ).tuples()
+    )
+    reminders = [
+        {
+            "key": f"report:{student_id}:{report_type}",
+            "audience": f"student:{student_id}",
+            "kind": "missing_report",
+            "message": f"Your {label} has not been submitted yet.",
+        }
+        for student_id in accepted
+        for report_type, label in REPORT_TYPES.items()
+        if (student_id, report_type) not in submitted
+    ]
+    keys = [
+        f"report:{student_id}:{report_type}"
+        for student_id in student_ids
+        for report_type in REPORT_TYPES
+    ]
+    replace_reminders(reminders, keys)
+
+
+@job_handler("report_reminders")
+def report_reminders(student_ids):
+    refresh_report_reminders(student_ids)
+    db.session.commit()
+
+
+@job_handler("job_deadline_reminders")
+def job_deadline_reminders(job_ids):
+    postings = db.session.execute(
+        db.select(JobPosting.id, JobPosting.title, JobPosting.deadline).where(
+            JobPosting.id.in_(job_ids), JobPosting.deadline > datetime.utcnow()
+        )
+    ).all()
+    replace_reminders(
+        [
+            {
+                "key": f"job:{posting.id}",
+                "audience": "students",
+                "kind": "job_deadline",
+                "message": (
+                    f"Applications for {posting.title} close on "
+                    f"{posting.deadline:%Y-%m-%d}."
+                ),
+                "due_at": posting.deadline,
+            }
+            for posting in postings
+        ],
+        [f"job:{job_id}" for job_id in job_ids],
+    )
+    db.session.commit()
+
+
+@job_handler("application_status_reminders")
+def application_status_reminders(application_ids):
+    rows = db.session.execute(
+        db.select(
+            CoopApplication.id, CoopApplication.status, User.id.label("student_id")
+        )
+        .join(User, User.id == CoopApplication.user_id)
+        .where(CoopApplication.id.in_(application_ids), User.role == "student")
+    ).all()
+    replace_reminders(
+        [
+            {
+                "key": f"application:{row.id}",
+                "audience": f"student:{row.student_id}",
+                "kind": "application_status",
+                "message": f"Your co-op application status is now {row.status}.",
+            }
+            for row in rows
+        ],
+        [f"application:{app_id}" for app_id in application_ids],
+    )
+    student_ids = sorted({row.student_id for row in rows})
+    if student_ids:
+        refresh_report_reminders(student_ids)
+    db.session.commit()
+
+
+@job_handler("refresh_reminders")
+def refresh_reminders():
+    # Periodic sweep: drop reminders whose deadline has passed and rebuild the
+    # missing-report reminders for accepted students in batches.
+    db.session.execute(db.delete(Reminder).where(Reminder.due_at < datetime.utcnow()))
+    db.session.commit()
+    after_id = 0
+    batch = app.config["IMPORT_CHUNK_SIZE"]
+    while True:
+        student_ids = db.session.scalars(
+            accepted_student_ids()
+            .where(User.id > after_id)
+            .distinct()
+            .order_by(User.id)
+            .limit(batch)
+        ).all()
+        if not student_ids:
+            break
+        refresh_report_reminders(student_ids)
+        db.session.commit()
+        after_id = student_ids[-1]
+
+
+def student_reminders(student_id):
+    now = datetime.utcnow()
+    window = now + timedelta(days=app.config["REMINDER_DEADLINE_WINDOW_DAYS"])
+    return (
+        db.session.query(Reminder.kind, Reminder.message, Reminder.due_at)
+        .filter(
+            Reminder.audience.in_([f"student:{student_id}", "students"]),
+            db.or_(Reminder.due_at.is_(None), Reminder.due_at.between(now, window)),
+        )
+        .order_by(Reminder.due_at, Reminder.id)
+        .all()
+    )
+
+
+@app.cli.command("refresh-reminders")
+def refresh_reminders_command():
+    refresh_reminders()
+    click.echo("Reminders refreshed.")
+
+
+@job_handler("sweep_sessions")
+def sweep_sessions():
+    db.session.execute(
+        db.delete(UserSession).where(UserSession.expires_at < datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def import_file_path(data_import):
+    return os.path.join(
+        app.config["IMPORT_FOLDER"], f"{data_import.id}.{data_import.format}"
+    )
+
+
+def import_errors_path(data_import):
+    return os.path.join(app.config["IMPORT_FOLDER"], f"{data_import.id}-errors.csv")
+
+
+@job_handler("import_data")
+def run_data_import(import_id):
+    data_import = db.session.get(DataImport, import_id)
+    if data_import is None:
+        return
+    data_import.status = "running"
+    db.session.commit()
+
+    with open(import_errors_path(data_import), "w", newline="") as errors_file:
+        writer = csv.writer(errors_file)
+        writer.writerow(["line", "error"])
+        with open(import_file_path(data_import), "rb") as stream:
+            imported, failed = import_records(
+                data_import.kind,
+                stream,
+                data_import.format,
+                lambda line_number, message: writer.writerow([line_number, message]),
+            )
+    data_import.imported = imported
+    data_import.failed = failed
+    data_import.status = "done"
+    data_import.error = None
+    data_import.finished_at = datetime.utcnow()
+    db.session.commit()
+    # The upload holds plaintext passwords, so it isn't kept.
+    os.remove(import_file_path(data_import))
+
+
+@job_handler("import_data", registry=JOB_FAILURE_HANDLERS)
+def run_data_import_failed(import_id):
+    data_import = db.session.get(DataImport, import_id)
+    if data_import is not None:
+        data_import.status = "failed"
+        data_import.error = "Import failed. Rows imported before the error remain."
+        data_import.finished_at = datetime.utcnow()
+        if os.path.exists(import_file_path(data_import)):
+            os.remove(import_file_path(data_import))
+
+
+@job_handler("process_report", registry=JOB_FAILURE_HANDLERS)
+def process_report_failed(report_id):
+    report = db.session.get(Report, report_id)
+    if report is not None:
+        report.processing_status = "failed"
+        report.processing_error = "Report processing failed."
+
+
+def term_bounds(term):
+    season, _, year = term.partition("-")
+    if season not in TERMS or not year.isdigit():
+        raise ValueError(f"Invalid term {term!r}, expected e.g. 'fall-2025'.")
+    start_month, end_month = TERMS[season]
+    start = datetime(int(year), start_month, 1)
+    if end_month > 12:
+        return start, datetime(int(year) + 1, 1, 1)
+    return start, datetime(int(year), end_month, 1)
+
+
+def current_term(now=None):
+    now = now or datetime.utcnow()
+    for season, (start_month, end_month) in TERMS.items():
+        if start_month <= now.month < end_month:
+            return f"{season}-{now.year}"
+
+
+def upcoming_terms(count=3):
+    seasons = list(TERMS)
+    season, _, year = current_term().partition("-")
+    index, year = seasons.index(season), int(year)
+    terms = []
+    for _ in range(count):
+        terms.append(f"{seasons[index]}-{year}")
+        index += 1
+        if index == len(seasons):
+            index, year = 0, year + 1
+    return terms
+
+
+class ZipStreamBuffer:
+    # Write-only sink for zipfile. It has no seek(), so zipfile writes data
+    # descriptors instead of rewinding, and drain() hands the bytes written so
+    # far to the response generator.
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(entries):
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for arcname, path, modified in entries:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            info = zipfile.ZipInfo(arcname, date_time=modified.timetuple()[:6])
+            info.file_size = size
+            with open(path, "rb") as source, archive.open(info, "w") as dest:
+                while True:
+                    chunk = source.read(app.config["UPLOAD_CHUNK_SIZE"])
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+# Aggregates for the analytics page, keyed by (name, term, data version).
+analytics_cache = TTLCache(
+    app.config["ANALYTICS_CACHE_SIZE"], app.config["ANALYTICS_CACHE_TTL"]
+)
+
+
+def analytics_data_version():
+    # High-water ids of the aggregated tables, each a single primary key index
+    # lookup. Their rows are only ever appended, and every status change
+    # appends an ApplicationEvent, so any write that can change an aggregate
+    # moves one of them.
+    tables = (CoopApplication, ApplicationEvent, JobPosting, Report)
+    columns = [db.select(db.func.max(table.id)).scalar_subquery() for table in tables]
+    return tuple(db.session.execute(db.select(*columns)).one())
+
+
+def term_filter(column, term):
+    if not term:
+        return db.true()
+    start, end = term_bounds(term)
+    return db.and_(column >= start, column < end)
+
+
+def applications_by_year(term=""):
+    query = db.select(
+        CoopApplication.student_year,
+        CoopApplication.status,
+        db.func.count(CoopApplication.id),
+    ).group_by(CoopApplication.student_year, CoopApplication.status)
+    if term:
+        query = query.where(CoopApplication.term == term)
+    rows = {}
+    for year, status, count in db.session.execute(query):
+        counts = rows.setdefault(year, {s: 0 for s in APPLICATION_STATUSES})
+        counts[status] = counts.get(status, 0) + count
+        counts["total"] = counts.get("total", 0) + count
+    return [(year, rows[year]) for year in sorted(rows)]
+
+
+def postings_by_type(term=""):
+    query = (
+        db.select(
+            JobPosting.job_type,
+            db.func.count(JobPosting.id),
+            db.func.count(db.distinct(JobPosting.employer_id)),
+        )
+        .where(term_filter(JobPosting.created_at, term))
+        .group_by(JobPosting.job_type)
+        .order_by(JobPosting.job_type)
+    )
+    return db.session.execute(query).all()
+
+
+def reports_by_type(term=""):
+    query = (
+        db.select(
+            Report.report_type,
+            db.func.count(Report.id),
+            db.func.count(db.distinct(Report.student_id)),
+        )
+        .where(term_filter(Report.submitted_at, term))
+        .group_by(Report.report_type)
+        .order_by(Report.report_type)
+    )
+    return db.session.execute(query).all()
+
+
+ANALYTICS = {
+    "applications_by_year": applications_by_year,
+    "postings_by_type": postings_by_type,
+    "reports_by_type": reports_by_type,
+}
+
+
+def analytics_summary(term=""):
+    version = analytics_data_version()
+    summary = {}
+    for name, aggregate in ANALYTICS.items():
+        key = (name, term, version)
+        result = analytics_cache.get(key)
+        if result is None:
+            result = aggregate(term)
+            analytics_cache.set(key, result)
+        summary[name] = result
+    return summary
+
+
+# Export datasets as (columns, term filter). Term filters take a validated
+# term and return a WHERE clause.
+EXPORTS = {
+    "applications": (
+        (
+            CoopApplication.id,
+            CoopApplication.term,
+            CoopApplication.student_number,
+            CoopApplication.full_name,
+            CoopApplication.student_year,
+            CoopApplication.linkedin,
+            CoopApplication.status,
+        ),
+        lambda term: CoopApplication.term == term,
+    ),
+    "postings": (
+        (
+            JobPosting.id,
+            JobPosting.employer_id,
+            JobPosting.title,
+            JobPosting.location,
+            JobPosting.job_type,
+            JobPosting.deadline,
+            JobPosting.created_at,
+        ),
+        lambda term: term_filter(JobPosting.created_at, term),
+    ),
+    "reports": (
+        (
+            Report.id,
+            Report.student_id,
+            Report.report_type,
+            Report.pdf_filename,
+            Report.submitted_at,
+            Report.processing_status,
+            Report.page_count,
+        ),
+        lambda term: term_filter(Report.submitted_at, term),
+    ),
+}
+
+
+def export_rows(dataset, term=""):
+    # Rows are fetched EXPORT_BATCH_SIZE at a time from a server-side cursor,
+    # ordered by primary key, so an export never holds more than one batch.
+    columns, where = EXPORTS[dataset]
+    query = db.select(*columns).order_by(columns[0])
+    if term:
+        query = query.where(where(term))
+    return db.session.execute(
+        query.execution_options(yield_per=app.config["EXPORT_BATCH_SIZE"])
+    )
+
+
+def stream_csv(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % app.config["EXPORT_BATCH_SIZE"] == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_header(dataset):
+    return [column.key for column in EXPORTS[dataset][0]]
+
+
+QR_CODE_MIMETYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+@lru_cache(maxsize=256)
+def render_qr_code(uri, image_format="png"):
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(uri)
+    qr.make(fit=True)
+    if image_format == "svg":
+        return qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).to_string()
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def qr_code_src(user):
+    image_format = app.config["QR_CODE_FORMAT"]
+    if app.config["QR_CODE_MODE"] == "endpoint":
+        return url_for("two_factor_qr", image_format=image_format)
+    image = render_qr_code(user.get_two_factor_uri(), image_format)
+    return "data:{};base64,{}".format(
+        QR_CODE_MIMETYPES[image_format], base64.b64encode(image).decode()
+    )
+
+
+# Strings are kept as-is; everything between them is minified.
+CSS_STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+
+
+def minify_css(source):
+    parts = CSS_STRING.split(CSS_COMMENT.sub("", source))
+    for i in range(0, len(parts), 2):
+        part = re.sub(r"\s+", " ", parts[i])
+        part = re.sub(r" ?([{};,>]) ?", r"\1", part)
+        parts[i] = part.replace(": ", ":").replace(";}", "}")
+    return "".join(parts).strip()
+
+
+# Applied to source files by extension. Other files, including JavaScript,
+# which can't be minified safely without a parser, are copied unchanged.
+ASSET_MINIFIERS = {".css": minify_css}
+
+
+def asset_manifest_path():
+    return os.path.join(
+        app.static_folder, app.config["ASSET_BUILD_DIR"], "manifest.json"
+    )
+
+
+def precompress(path, data):
+    compressed = {".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        compressed[".br"] = brotli.compress(data)
+    for suffix, body in compressed.items():
+        if len(body) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(body)
+
+
+def build_assets():
+    build_dir = app.config["ASSET_BUILD_DIR"]
+    manifest = {}
+    for root, dirs, files in os.walk(app.static_folder):
+        if root == app.static_folder:
+            dirs[:] = [d for d in dirs if d != build_dir]
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            filename = os.path.relpath(source, app.static_folder).replace(os.sep, "/")
+            stem, ext = os.path.splitext(filename)
+            with open(source, "rb") as f:
+                data = f.read()
+            if ext in ASSET_MINIFIERS:
+                data = ASSET_MINIFIERS[ext](data.decode("utf-8")).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            built = f"{build_dir}/{stem}.{digest}{ext}"
+            path = os.path.join(app.static_folder, built)
+            # Builds of earlier content stay in place, so pages rendered
+            # before a deploy can still load the assets they reference.
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+                precompress(path, data)
+            manifest[filename] = built
+    manifest_path = asset_manifest_path()
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=os.path.dirname(manifest_path), delete=False
+    ) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, manifest_path)
+    asset_manifest.cache_clear()
+    return manifest
+
+
+@lru_cache(maxsize=1)
+def asset_manifest():
+    try:
+        with open(asset_manifest_path()) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    # The debug server serves sources directly so edits show up on reload.
+    if endpoint == "static" and not app.debug and "filename" in values:
+        values["filename"] = asset_manifest().get(
+            values["filename"], values["filename"]
+        )
+
+
+def send_static_file(filename):
+    if not filename.startswith(app.config["ASSET_BUILD_DIR"] + "/"):
+        return app.send_static_file(filename)
+    mimetype = mimetypes.guess_type(filename)[0]
+    response = None
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if encoding in request.accept_encodings and os.path.isfile(
+            os.path.join(app.static_folder, filename + suffix)
+        ):
+            response = send_from_directory(
+                app.static_folder, filename + suffix, mimetype=mimetype
+            )
+            response.headers["Content-Encoding"] = encoding
+            break
+    if response is None:
+        response = send_from_directory(app.static_folder, filename, mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config["ASSET_MAX_AGE"]
+    response.cache_control.immutable = True
+    return response
+
+
+app.view_functions["static"] = send_static_file
+
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    manifest = build_assets()
+    click.echo(f"Built {len(manifest)} asset(s) into {asset_manifest_path()}.")
+
+
+response_cache = TTLCache(
+    app.config["RESPONSE_CACHE_SIZE"], app.config["RESPONSE_CACHE_TTL"]
+)
+
+
+def response_encoding():
+    if brotli is not None and request.accept_encodings["br"]:
+        return "br"
+    if request.accept_encodings["gzip"]:
+        return "gzip"
+    return None
 
 
-class JobPosting(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    employer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text, nullable=False)
-    location = db.Column(db.String(200), nullable=False)
-    job_type = db.Column(db.String(50), nullable=False)
-    deadline = db.Column(db.DateTime, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=app.config["COMPRESS_LEVEL"])
+    return gzip.compress(data, app.config["COMPRESS_LEVEL"])
 
 
-class Report(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    pdf_filename = db.Column(db.String(200))
-    report_type = db.Column(db.String(50), nullable=False)
-    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+def compress_stream(chunks, encoding):
+    # Each chunk is flushed as soon as it's compressed so streamed pages
+    # still reach the client incrementally.
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=app.config["COMPRESS_LEVEL"])
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(app.config["COMPRESS_LEVEL"], zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
 
 
-class CoopApplication(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    full_name = db.Column(db.String(120), nullable=False)
-    address = db.Column(db.String(255), nullable=False)
-    dob = db.Column(db.Date, nullable=False)
-    student_number = db.Column(db.String(50), unique=True, nullable=False)
-    student_year = db.Column(db.Integer, nullable=False)
-    linkedin = db.Column(db.String(255), nullable=False)
-    status = db.Column(db.String(50), default="Under Review")
+def cached_page(template, data_version=None, context=dict):
+    # Serves a rendered page from response_cache. The key covers everything
+    # base.html reads from the session, so context() (and any queries in it)
+    # only runs when data_version changes or the entry expires. Pages with
+    # pending flash messages are rendered fresh.
+    if "_flashes" in session:
+        return render_template(template, **context())
+    key = (
+        template,
+        request.full_path,
+        session.get("user_id"),
+        session.get("role"),
+        session.get("username"),
+        data_version,
+    )
+    page = response_cache.get(key)
+    if page is None:
+        body = render_template(template, **context()).encode("utf-8")
+        page = {"body": body, "etag": hashlib.sha256(body).hexdigest()[:32]}
+        response_cache.set(key, page)
 
-    def update_status(self, new_status):
-        self.status = new_status
-        db.session.commit()
+    response = app.response_class(mimetype="text/html")
+    response.set_etag(page["etag"], weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add("Accept-Encoding")
+    if request.if_none_match.contains_weak(page["etag"]):
+        response.status_code = 304
+        return response
+    encoding = response_encoding()
+    if encoding and len(page["body"]) >= app.config["COMPRESS_MIN_SIZE"]:
+        if encoding not in page:
+            page[encoding] = compress(page["body"], encoding)
+        response.set_data(page[encoding])
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response.set_data(page["body"])
+    return response
 
 
-if not os.path.exists(app.config["UPLOAD_FOLDER"]):
-    os.makedirs(app.config["UPLOAD_FOLDER"])
+@app.after_request
+def compress_response(response):
+    if (
+        response.mimetype != "text/html"
+        or response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    encoding = response_encoding()
+    response.vary.add("Accept-Encoding")
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop("Content-Length", None)
+    elif response.content_length >= app.config["COMPRESS_MIN_SIZE"]:
+        response.set_data(compress(response.get_data(), encoding))
+    else:
+        return response
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    return error.description, 503, {"Retry-After": "1"}
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    token = app.config["METRICS_TOKEN"]
+    if not token:
+        abort(404)
+    if not secrets.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    ):
+        abort(403)
+    return app.response_class(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 
 @app.route("/")
 def index():
-    return render_template("index.html")
+    return cached_page("index.html")
 
 
 @app.route("/register/<role>", methods=["GET", "POST"])
@@ -149,17 +3263,32 @@ def login():
     if request.method == "POST":
         username_or_email = request.form["username"]
         password = request.form["password"]
+        # The IP limit is checked before the user lookup and the account limit
+        # before the password hash, so a throttled client costs neither.
+        retry_after = throttled(client_ip_limit("login_ip"))
+        if retry_after:
+            return too_many_attempts("login.html", retry_after)
         user = User.query.filter(
             (User.username == username_or_email) | (User.email == username_or_email)
         ).first()
+        limits = dict(
+            client_ip_limit("login_ip"),
+            login_account=login_account_key(user, username_or_email),
+        )
+        retry_after = throttled({"login_account": limits["login_account"]})
+        if retry_after:
+            return too_many_attempts("login.html", retry_after)
 
         if user and user.check_password(password):
+            if user in db.session.dirty:
+                db.session.commit()
             if not user.is_active:
                 flash(
                     "Your account has been deactivated. Please contact an administrator."
                 )
                 return redirect(url_for("login"))
 
+            rate_limiter.reset("login_account", limits["login_account"])
             session["temp_user_id"] = user.id
             if not user.two_factor_enabled:
                 session.pop("temp_user_id", None)
@@ -170,16 +3299,58 @@ def login():
                 return redirect(url_for("dashboard"))
             return redirect(url_for("two_factor"))
         else:
+            for scope, key in limits.items():
+                rate_limiter.hit(scope, key)
             flash("Invalid credentials. Please try again.")
     return render_template("login.html")
 
 
+def client_ip_limit(scope):
+    # {scope: client address} for throttled(), or {} when the address can't
+    # tell clients apart.
+    address = request.remote_addr
+    if not address:
+        return {}
+    if not app.config["TRUSTED_PROXIES"] and ipaddress.ip_address(address).is_loopback:
+        return {}
+    return {scope: address}
+
+
+def login_account_key(user, username_or_email):
+    # One counter per account, whether it is named by username or email.
+    # Names that match no account are counted under the name itself, in their
+    # own namespace so they can't collide with an account's id.
+    if user is not None:
+        return f"user:{user.id}"
+    return f"name:{username_or_email.strip().lower()}"
+
+
+def too_many_attempts(template, retry_after, **context):
+    # Rendered without flash() so a throttled request writes no session.
+    minutes = max(1, round(retry_after / 60))
+    error = f"Too many failed attempts. Please try again in {minutes} minute(s)."
+    response = app.make_response(
+        (render_template(template, error=error, **context), 429)
+    )
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
 @app.route("/two_factor", methods=["GET", "POST"])
 def two_factor():
     if "temp_user_id" not in session:
         flash("Session expired. Please login again.")
         return redirect(url_for("login"))
 
+    limits = dict(
+        client_ip_limit("two_factor_ip"),
+        two_factor_account=session["temp_user_id"],
+    )
+    if request.method == "POST":
+        retry_after = throttled(limits)
+        if retry_after:
+            return too_many_attempts("2fa.html", retry_after, setup_mode=False)
+
     user = User.query.get(session["temp_user_id"])
     if not user:
         flash("User not found.")
@@ -194,21 +3365,12 @@ def two_factor():
         return redirect(url_for("dashboard"))
 
     if not user.two_factor_initiated:
-
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(user.get_two_factor_uri())
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        qr_code = base64.b64encode(buffered.getvalue()).decode()
-
         if request.method == "POST":
             code = request.form.get("code")
             if user.verify_two_factor(code):
                 user.two_factor_initiated = True
                 db.session.commit()
+                rate_limiter.reset("two_factor_account", user.id)
                 session.pop("temp_user_id", None)
                 session["user_id"] = user.id
                 session["role"] = user.role
@@ -216,12 +3378,15 @@ def two_factor():
                 flash("Two-factor authentication setup and verification successful.")
                 return redirect(url_for("dashboard"))
             else:
+                for scope, key in limits.items():
+                    rate_limiter.hit(scope, key)
                 flash("Invalid verification code. Please try again.")
-        return render_template("2fa.html", qr_code=qr_code, setup_mode=True)
+        return render_template("2fa.html", qr_code=qr_code_src(user), setup_mode=True)
 
     if request.method == "POST":
         code = request.form.get("code")
         if user.verify_two_factor(code):
+            rate_limiter.reset("two_factor_account", user.id)
             session.pop("temp_user_id", None)
             session["user_id"] = user.id
             session["role"] = user.role
@@ -229,12 +3394,32 @@ def two_factor():
             flash("Two-factor authentication successful.")
             return redirect(url_for("dashboard"))
         else:
+            for scope, key in limits.items():
+                rate_limiter.hit(scope, key)
             flash("Invalid verification code.")
             return redirect(url_for("two_factor"))
 
     return render_template("2fa.html", setup_mode=False)
 
 
+@app.route("/two_factor/qr.<image_format>")
+def two_factor_qr(image_format):
+    if image_format not in QR_CODE_MIMETYPES or "temp_user_id" not in session:
+        abort(404)
+    user = db.session.get(User, session["temp_user_id"])
+    if not user or not user.two_factor_enabled or user.two_factor_initiated:
+        abort(404)
+
+    uri = user.get_two_factor_uri()
+    response = app.response_class(
+        render_qr_code(uri, image_format), mimetype=QR_CODE_MIMETYPES[image_format]
+    )
+    response.set_etag(hashlib.sha256(uri.encode()).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.max_age = app.config["QR_CODE_MAX_AGE"]
+    return response.make_conditional(request)
+
+
 @app.route("/logout")
 def logout():
     session.clear()
@@ -242,24 +3427,203 @@ def logout():
     return redirect(url_for("index"))
 
 
-def check_active_user():
-    if "user_id" not in session:
-        return False
-    user = User.query.get(session["user_id"])
-    if not user or not user.is_active:
-        session.clear()
-        flash("Your account has been deactivated. Please contact an administrator.")
-        return False
-    return True
+session_serializer = TaggedJSONSerializer()
 
 
-@app.before_request
-def check_user_status():
-    if request.endpoint and request.endpoint != "static":
-        excluded_routes = ["login", "logout", "index", "register"]
-        if request.endpoint not in excluded_routes and "user_id" in session:
-            if not check_active_user():
-                return redirect(url_for("login"))
+def session_key(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def session_identity(data):
+    return data.get("user_id"), data.get("temp_user_id")
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, token=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.token = token
+        self.expires_at = expires_at
+        self.identity = session_identity(self)
+        self.modified = False
+        self.saved = False
+        self.from_cookie = False
+
+
+class DatabaseSessionInterface(SessionInterface):
+    # The cookie carries only a random token. Loading a session is a single
+    # primary-key read, and a row is written only when the session changes
+    # or its expiry is due to slide forward. Sessions without a signed-in or
+    # half-signed-in user are kept in a separate signed cookie instead.
+    anonymous_cookie = SecureCookieSessionInterface()
+
+    def get_anonymous_cookie_name(self, app):
+        return f"{self.get_cookie_name(app)}_anon"
+
+    def open_session(self, app, request):
+        start_request_timer()
+        token = request.cookies.get(self.get_cookie_name(app))
+        anonymous = request.cookies.get(self.get_anonymous_cookie_name(app))
+        if token:
+            with db.engine.connect() as conn:
+                row = conn.execute(
+                    db.select(UserSession.data, UserSession.expires_at).where(
+                        UserSession.id == session_key(token),
+                        UserSession.expires_at > datetime.utcnow(),
+                    )
+                ).first()
+            if row:
+                return ServerSession(
+                    session_serializer.loads(row.data), token, row.expires_at
+                )
+        elif anonymous:
+            signer = self.anonymous_cookie.get_signing_serializer(app)
+            try:
+                data = signer.loads(
+                    anonymous,
+                    max_age=int(app.permanent_session_lifetime.total_seconds()),
+                )
+            except BadSignature:
+                data = {}
+            session = ServerSession(data)
+            session.from_cookie = True
+            return session
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        # Runs from save_session_before_metrics, then again from Flask.
+        if session.saved:
+            return
+        session.saved = True
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        now = datetime.utcnow()
+        if session_identity(session) == (None, None):
+            self.save_anonymous_session(app, session, response)
+            return
+        if session.from_cookie:
+            response.delete_cookie(
+                self.get_anonymous_cookie_name(app), domain=domain, path=path
+            )
+        lifetime = app.permanent_session_lifetime
+        # Start a new token whenever the logged-in identity changes, so a
+        # token seen before login is never the one that carries it.
+        rotate = session.token and session_identity(session) != session.identity
+        refresh = session.expires_at and session.expires_at - now < lifetime - (
+            timedelta(seconds=app.config["SESSION_REFRESH_INTERVAL"])
+        )
+
+        if not (session.modified or rotate or refresh or not session.token):
+            return
+
+        with db.engine.begin() as conn:
+            if rotate:
+                conn.execute(
+                    db.delete(UserSession).where(
+                        UserSession.id == session_key(session.token)
+                    )
+                )
+            user_id, temp_user_id = session_identity(session)
+            values = {
+                "user_id": user_id or temp_user_id,
+                "data": session_serializer.dumps(dict(session)),
+                "expires_at": now + lifetime,
+            }
+            if session.token and not rotate:
+                updated = conn.execute(
+                    db.update(UserSession)
+                    .where(UserSession.id == session_key(session.token))
+                    .values(**values)
+                ).rowcount
+                if not updated:
+                    # Revoked while this request ran: don't bring it back.
+                    response.delete_cookie(name, domain=domain, path=path)
+                    return
+            else:
+                session.token = secrets.token_urlsafe(32)
+                conn.execute(
+                    db.insert(UserSession).values(
+                        id=session_key(session.token), **values
+                    )
+                )
+
+        response.set_cookie(
+            name,
+            session.token,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+    def save_anonymous_session(self, app, session, response):
+        name = self.get_anonymous_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.token:
+            # Signed out: the database row goes, whatever else is kept.
+            with db.engine.begin() as conn:
+                conn.execute(
+                    db.delete(UserSession).where(
+                        UserSession.id == session_key(session.token)
+                    )
+                )
+            response.delete_cookie(self.get_cookie_name(app), domain=domain, path=path)
+        elif not session.modified:
+            return
+        if not session:
+            if session.from_cookie:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        signer = self.anonymous_cookie.get_signing_serializer(app)
+        response.set_cookie(
+            name,
+            signer.dumps(dict(session)),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+
+app.session_interface = DatabaseSessionInterface()
+
+
+@app.after_request
+def save_session_before_metrics(response):
+    # Flask saves the session after every after_request hook, which would
+    # leave the session store's statements out of record_request_metrics.
+    # Hooks registered earlier run after this one and don't touch the session.
+    app.session_interface.save_session(app, session._get_current_object(), response)
+    return response
+
+
+def revoke_user_sessions(user_id):
+    with db.engine.begin() as conn:
+        conn.execute(db.delete(UserSession).where(UserSession.user_id == user_id))
+
+
+def get_current_user():
+    if "current_user" not in g:
+        g.current_user = None
+        if "user_id" in session:
+            g.current_user = db.session.get(User, session["user_id"])
+    return g.current_user
+
+
+def check_active_user():
+    # Deactivating, deleting or changing the role of a user revokes their
+    # sessions, so a session that still carries user_id is current.
+    return "user_id" in session
 
 
 @app.route("/dashboard")
@@ -283,29 +3647,161 @@ def dashboard():
 
 @app.route("/dashboard/student")
 def student_dashboard():
-    return render_template("student_dashboard.html")
+    return cached_page("student_dashboard.html")
 
 
 @app.route("/dashboard/coordinator")
 def coordinator_dashboard():
-    return render_template("coordinator_dashboard.html")
+    return cached_page("coordinator_dashboard.html")
 
 
 @app.route("/dashboard/employer")
 def employer_dashboard():
-    job_postings = JobPosting.query.filter_by(employer_id=session.get("user_id")).all()
-    return render_template("employer_dashboard.html", job_postings=job_postings)
+    employer_id = session.get("user_id")
+
+    def context():
+        job_postings, next_cursor = list_job_postings(
+            db.session.query(*JOB_LIST_COLUMNS).filter(
+                JobPosting.employer_id == employer_id
+            ),
+            after=request.args.get("after"),
+        )
+        return {
+            "job_postings": job_postings,
+            "next_cursor": next_cursor,
+            "paged": bool(request.args.get("after")),
+        }
+
+    # Postings are only ever added, so their count and highest id change
+    # whenever the list does. Both come from the (employer_id, ...) index.
+    version = tuple(
+        db.session.execute(
+            db.select(db.func.count(JobPosting.id), db.func.max(JobPosting.id)).where(
+                JobPosting.employer_id == employer_id
+            )
+        ).one()
+    )
+    return cached_page("employer_dashboard.html", version, context)
+
+
+@app.route("/jobs")
+def job_board():
+    filters = {
+        "job_type": request.args.get("job_type", ""),
+        "location": request.args.get("location", ""),
+    }
+    terms = request.args.get("q", "").strip()
+    if terms:
+        page = max(request.args.get("page", 1, type=int), 1)
+        results, has_more = search_job_postings(terms, page=page, **filters)
+        return render_template(
+            "job_board.html",
+            results=results,
+            terms=terms,
+            page=page,
+            has_more=has_more,
+            options=job_board_options(),
+            filters=filters,
+        )
+
+    job_postings, next_cursor = open_job_postings(
+        after=request.args.get("after"), **filters
+    )
+    return render_template(
+        "job_board.html",
+        job_postings=job_postings,
+        terms="",
+        options=job_board_options(),
+        filters=filters,
+        next_cursor=next_cursor,
+        paged=bool(request.args.get("after")),
+    )
 
 
 @app.route("/dashboard/admin")
 def admin_dashboard():
-    users = User.query.all()
-    return render_template("admin_dashboard.html", users=users)
+    filters = user_list_filters()
+    users, next_cursor = list_users(filters, after=request.args.get("after"))
+    return render_template(
+        "admin_dashboard.html",
+        users=users,
+        counts=user_counts(),
+        filters=filters,
+        next_cursor=next_cursor,
+    )
+
+
+@app.route("/import_data", methods=["GET", "POST"])
+def import_data():
+    if not check_active_user():
+        return redirect(url_for("login"))
+
+    if session.get("role") != "admin":
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    if request.method == "POST":
+        kind = request.form.get("kind")
+        file = request.files.get("file")
+        if kind not in IMPORT_VALIDATORS:
+            flash("Please select what to import.")
+            return redirect(request.url)
+        if not file or file.filename == "":
+            flash("No file selected.")
+            return redirect(request.url)
+        fmt = request.form.get("format")
+        if fmt not in IMPORT_FORMATS:
+            fmt = "jsonl" if file.filename.lower().endswith(".jsonl") else "csv"
+
+        # Hashing passwords for a large file takes minutes, so the upload is
+        # saved and imported by a background job.
+        data_import = DataImport(
+            kind=kind,
+            format=fmt,
+            filename=secure_filename(file.filename) or f"import.{fmt}",
+            created_by=session["user_id"],
+        )
+        db.session.add(data_import)
+        db.session.flush()
+        os.makedirs(app.config["IMPORT_FOLDER"], exist_ok=True)
+        file.save(import_file_path(data_import))
+        enqueue_job("import_data", import_id=data_import.id)
+        db.session.commit()
+        notify_job_workers()
+        flash("Import queued. Refresh this page to see its progress.")
+        return redirect(url_for("import_data"))
+    imports = db.session.scalars(
+        db.select(DataImport)
+        .order_by(DataImport.id.desc())
+        .limit(app.config["IMPORT_PAGE_SIZE"])
+    ).all()
+    return render_template("import_data.html", imports=imports)
+
+
+@app.route("/import_data/<int:import_id>/errors")
+def import_data_errors(import_id):
+    if not check_active_user():
+        return redirect(url_for("login"))
+
+    if session.get("role") != "admin":
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    data_import = db.get_or_404(DataImport, import_id)
+    path = import_errors_path(data_import)
+    if not os.path.isfile(path):
+        abort(404)
+    return send_file(
+        path,
+        mimetype="text/csv",
+        as_attachment=True,
+        download_name=f"{data_import.kind}-import-{data_import.id}-errors.csv",
+    )
 
 
 @app.route("/faq")
 def faq():
-    return render_template("faq.html")
+    return cached_page("faq.html")
 
 
 @app.route("/manage_user", methods=["GET", "POST"])
@@ -323,13 +3819,26 @@ def manage_user():
         if action == "delete" and user:
             db.session.delete(user)
             db.session.commit()
+            revoke_user_sessions(user.id)
             flash("User deleted successfully.")
         elif action == "edit" and user:
+            role_changed = user.role != request.form.get("role")
             user.role = request.form.get("role")
             db.session.commit()
+            if role_changed:
+                revoke_user_sessions(user.id)
             flash("User role updated successfully.")
-    users = User.query.all()
-    return render_template("manage_user.html", users=users)
+    filters = user_list_filters()
+    users, next_cursor = list_users(filters, after=request.args.get("after"))
+    return render_template(
+        "manage_user.html",
+        users=users,
+        counts=user_counts(),
+        filters=filters,
+        roles=USER_ROLES,
+        next_cursor=next_cursor,
+        paged=bool(request.args.get("after")),
+    )
 
 
 @app.route("/edit_user/<int:user_id>", methods=["GET", "POST"])
@@ -345,6 +3854,7 @@ def edit_user(user_id):
 
     if request.method == "POST":
         action = request.form.get("action")
+        revoke = action == "deactivate"
 
         if action == "activate":
             user.is_active = True
@@ -353,12 +3863,15 @@ def edit_user(user_id):
             user.is_active = False
             flash(f"User {user.username} has been deactivated.")
         elif action == "edit":
+            revoke = user.role != request.form.get("role")
             user.role = request.form.get("role")
             user.name = request.form.get("name")
             user.email = request.form.get("email")
             flash(f"User {user.username} has been updated.")
 
         db.session.commit()
+        if revoke:
+            revoke_user_sessions(user.id)
         return redirect(url_for("manage_user"))
 
     return render_template("edit_user.html", user=user)
@@ -389,7 +3902,11 @@ def add_job():
             deadline=deadline,
         )
         db.session.add(job)
+        db.session.flush()
+        enqueue_job("job_deadline_reminders", job_ids=[job.id])
         db.session.commit()
+        notify_job_workers()
+        invalidate_job_board()
         flash("Job posting added successfully.")
         return redirect(url_for("employer_dashboard"))
     return render_template("add_job.html")
@@ -422,20 +3939,19 @@ def upload_report():
 
         if file and file.filename.lower().endswith(".pdf"):
             try:
-                ext = file.filename.rsplit(".", 1)[1].lower()
-                unique_filename = (
-                    f"{session['user_id']}_{datetime.utcnow().timestamp()}.{ext}"
-                )
-                filepath = os.path.join(app.config["UPLOAD_FOLDER"], unique_filename)
-
-                file.save(filepath)
+                blob = store_blob(file.stream)
                 report = Report(
                     student_id=session["user_id"],
-                    pdf_filename=unique_filename,
+                    pdf_filename=secure_filename(file.filename) or "report.pdf",
+                    blob_hash=blob.sha256,
                     report_type=report_type,
                 )
                 db.session.add(report)
+                db.session.flush()
+                enqueue_job("process_report", report_id=report.id)
+                enqueue_job("report_reminders", student_ids=[session["user_id"]])
                 db.session.commit()
+                notify_job_workers()
                 flash("Work term report uploaded successfully.")
                 return redirect(url_for("student_dashboard"))
             except Exception as e:
@@ -448,6 +3964,191 @@ def upload_report():
     return render_template("upload_report.html")
 
 
+def accessible_report(report_id):
+    report = db.session.get(Report, report_id)
+    if not report:
+        abort(404)
+    if session["role"] == "student" and report.student_id != session["user_id"]:
+        abort(404)
+    return report
+
+
+@app.route("/reports/<int:report_id>/download")
+def download_report(report_id):
+    if "user_id" not in session or session.get("role") not in (
+        "student",
+        "coordinator",
+        "admin",
+    ):
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    report = accessible_report(report_id)
+    path = report_file_path(report)
+    if not os.path.isfile(path):
+        abort(404)
+
+    response = send_file(
+        path,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=report.pdf_filename,
+        conditional=True,
+        etag=report.blob_hash or True,
+        last_modified=report.submitted_at,
+        max_age=app.config["REPORT_DOWNLOAD_MAX_AGE"],
+    )
+    response.cache_control.private = True
+    response.cache_control.public = False
+    return response
+
+
+@app.route("/reports/<int:report_id>/thumbnail")
+def report_thumbnail(report_id):
+    if "user_id" not in session or session.get("role") not in (
+        "student",
+        "coordinator",
+        "admin",
+    ):
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    report = accessible_report(report_id)
+    if not report.thumbnail_hash:
+        abort(404)
+    response = send_file(
+        blob_path(report.thumbnail_hash),
+        mimetype="image/png",
+        conditional=True,
+        etag=report.thumbnail_hash,
+        max_age=app.config["REPORT_DOWNLOAD_MAX_AGE"],
+    )
+    response.cache_control.private = True
+    response.cache_control.public = False
+    return response
+
+
+@app.route("/reports/archive")
+def download_report_archive():
+    if "user_id" not in session or session.get("role") not in ("coordinator", "admin"):
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    report_type = request.args.get("report_type", "")
+    term = request.args.get("term", "")
+    if report_type not in REPORT_TYPES:
+        flash("Please select a report type.")
+        return redirect(url_for("dashboard"))
+    try:
+        start, end = term_bounds(term)
+    except ValueError as e:
+        flash(str(e))
+        return redirect(url_for("dashboard"))
+
+    rows = (
+        db.session.query(
+            Report.id,
+            Report.student_id,
+            Report.pdf_filename,
+            Report.blob_hash,
+            Report.submitted_at,
+        )
+        .filter(
+            Report.report_type == report_type,
+            Report.submitted_at >= start,
+            Report.submitted_at < end,
+        )
+        .order_by(Report.id)
+        .all()
+    )
+    entries = [
+        (
+            f"{report.student_id}_{report.id}_{report.pdf_filename}",
+            report_file_path(report),
+            report.submitted_at,
+        )
+        for report in rows
+    ]
+
+    return app.response_class(
+        stream_with_context(stream_zip(entries)),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename={report_type}-reports-{term}.zip"
+            )
+        },
+    )
+
+
+@app.route("/analytics")
+def analytics():
+    if "user_id" not in session or session.get("role") not in ("coordinator", "admin"):
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    term = request.args.get("term", "").strip()
+    try:
+        summary = analytics_summary(term)
+    except ValueError as e:
+        flash(str(e))
+        return redirect(url_for("analytics"))
+    return render_template(
+        "analytics.html",
+        term=term,
+        exports=list(EXPORTS),
+        statuses=APPLICATION_STATUSES,
+        report_types=REPORT_TYPES,
+        **summary,
+    )
+
+
+@app.route("/analytics/export/<dataset>")
+def export_analytics(dataset):
+    if "user_id" not in session or session.get("role") not in ("coordinator", "admin"):
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    if dataset not in EXPORTS:
+        abort(404)
+    term = request.args.get("term", "").strip()
+    if term:
+        try:
+            term_bounds(term)
+        except ValueError as e:
+            flash(str(e))
+            return redirect(url_for("analytics"))
+
+    filename = f"{dataset}-{term}.csv" if term else f"{dataset}.csv"
+    return app.response_class(
+        stream_with_context(
+            stream_csv(export_header(dataset), export_rows(dataset, term))
+        ),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@app.cli.command("export-data")
+@click.argument("dataset", type=click.Choice(list(EXPORTS)))
+@click.option("--term", default="", help="e.g. fall-2025; all rows if omitted.")
+@click.option("--output", "-o", "output_path", type=click.Path(dir_okay=False))
+def export_data_command(dataset, term, output_path):
+    if term:
+        try:
+            term_bounds(term)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--term")
+    chunks = stream_csv(export_header(dataset), export_rows(dataset, term))
+    if not output_path:
+        for chunk in chunks:
+            click.echo(chunk, nl=False)
+        return
+    with open(output_path, "w", newline="") as output:
+        for chunk in chunks:
+            output.write(chunk)
+
+
 @app.route("/document_portal", methods=["GET", "POST"])
 def document_portal():
     if "user_id" not in session:
@@ -462,12 +4163,16 @@ def document_portal():
             flash("No file selected.")
             return redirect(request.url)
         if file and allowed_file(file.filename):
+            blob = store_blob(file.stream)
             ext = file.filename.rsplit(".", 1)[1].lower()
-            unique_filename = (
-                f"{session['user_id']}_{datetime.utcnow().timestamp()}.{ext}"
+            document = Document(
+                owner_id=session["user_id"],
+                document_type=request.form.get("fileType"),
+                filename=secure_filename(file.filename) or f"document.{ext}",
+                blob_hash=blob.sha256,
             )
-            filepath = os.path.join(app.config["UPLOAD_FOLDER"], unique_filename)
-            file.save(filepath)
+            db.session.add(document)
+            db.session.commit()
             flash("Document uploaded successfully.")
             return redirect(url_for("dashboard"))
         else:
@@ -482,17 +4187,97 @@ def application_status():
         flash("Access denied.")
         return redirect(url_for("login"))
 
-    user = User.query.get(session["user_id"])
-    if not user or not user.name:
-        flash("No student name found for the logged-in user.")
-        return redirect(url_for("dashboard"))
-
-    application = CoopApplication.query.filter_by(full_name=user.name).first()
-    if not application:
+    applications = (
+        CoopApplication.query.filter_by(user_id=session["user_id"])
+        .order_by(CoopApplication.id.desc())
+        .all()
+    )
+    if not applications:
         flash("No application found.")
         return redirect(url_for("dashboard"))
 
-    return render_template("application_status.html", application=application)
+    last_event_id = db.session.scalar(
+        db.select(db.func.max(ApplicationEvent.id)).where(
+            ApplicationEvent.user_id == session["user_id"]
+        )
+    )
+    return render_template(
+        "application_status.html",
+        applications=applications,
+        last_event_id=last_event_id or 0,
+    )
+
+
+@app.route("/application_events", methods=["GET"])
+def application_events():
+    if "user_id" not in session or session.get("role") != "student":
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    user_id = session["user_id"]
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get(
+        "after", ""
+    )
+    seen = int(last_event_id) if last_event_id.isdigit() else None
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    def backlog():
+        if seen is None:
+            return []
+        return [event._asdict() for event in application_events_after(seen, user_id)]
+
+    if not event_stream_slots.acquire(blocking=False):
+        # Every streaming slot in this process is taken: answer like a poll,
+        # with whatever is new, and have the browser retry later.
+        body = f"retry: {app.config['EVENT_BUSY_RETRY_INTERVAL']}\n\n" + "".join(
+            sse_message(event) for event in backlog()
+        )
+        return app.response_class(body, mimetype="text/event-stream", headers=headers)
+
+    # Subscribe before reading the backlog so nothing committed in between is
+    # lost; events already sent from the backlog are skipped below.
+    try:
+        subscriber = status_events.subscribe(user_id)
+        events = backlog()
+    except Exception:
+        event_stream_slots.release()
+        raise
+
+    def stream():
+        yield f"retry: {app.config['EVENT_RETRY_INTERVAL']}\n\n"
+        last_id = seen or 0
+        for event in events:
+            last_id = event["id"]
+            yield sse_message(event)
+        # End the stream after EVENT_STREAM_TIMEOUT so the thread is freed;
+        # the browser reconnects with Last-Event-ID and misses nothing.
+        deadline = time.monotonic() + app.config["EVENT_STREAM_TIMEOUT"]
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = subscriber.get(
+                    timeout=min(remaining, app.config["EVENT_HEARTBEAT_INTERVAL"])
+                )
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if event["id"] > last_id:
+                last_id = event["id"]
+                yield sse_message(event)
+
+    def close():
+        status_events.unsubscribe(user_id, subscriber)
+        event_stream_slots.release()
+
+    response = app.response_class(
+        stream(), mimetype="text/event-stream", headers=headers
+    )
+    # call_on_close runs even if the client goes away before the generator
+    # starts, which a finally block inside it would not.
+    response.call_on_close(close)
+    return response
 
 
 @app.route("/submit_application", methods=["GET", "POST"])
@@ -501,8 +4286,9 @@ def submit_application():
         flash("Access denied.")
         return redirect(url_for("login"))
 
-    user = User.query.get(session["user_id"])
+    user = get_current_user()
     full_name = user.name if user else ""
+    terms = upcoming_terms()
 
     if request.method == "POST":
         fullname = request.form.get("fullname")
@@ -512,6 +4298,7 @@ def submit_application():
         student_num = request.form.get("studentnum")
         student_year = request.form.get("level")
         linkedin = request.form.get("linkedin")
+        term = request.form.get("term")
 
         if not all(
             [
@@ -522,11 +4309,24 @@ def submit_application():
                 student_num,
                 student_year,
                 linkedin,
+                term,
             ]
         ):
             flash("Please fill in all required fields.")
             return render_template(
-                "submit_application.html", form=request.form, full_name=full_name
+                "submit_application.html",
+                form=request.form,
+                full_name=full_name,
+                terms=terms,
+            )
+
+        if term not in terms:
+            flash("Please choose one of the listed terms.")
+            return render_template(
+                "submit_application.html",
+                form=request.form,
+                full_name=full_name,
+                terms=terms,
             )
 
         try:
@@ -534,10 +4334,21 @@ def submit_application():
         except ValueError:
             flash("Invalid date format. Please use YYYY-MM-DD.")
             return render_template(
-                "submit_application.html", form=request.form, full_name=full_name
+                "submit_application.html",
+                form=request.form,
+                full_name=full_name,
+                terms=terms,
             )
 
+        if CoopApplication.query.filter_by(
+            user_id=session["user_id"], term=term
+        ).first():
+            flash("You have already applied for this term.")
+            return redirect(url_for("application_status"))
+
         application = CoopApplication(
+            user_id=session["user_id"],
+            term=term,
             full_name=fullname,
             address="{} {}".format(address_line1, address_line2),
             dob=dob,
@@ -551,7 +4362,21 @@ def submit_application():
         flash("Application submitted successfully.")
         return redirect(url_for("dashboard"))
 
-    return render_template("submit_application.html", form={}, full_name=full_name)
+    return render_template(
+        "submit_application.html", form={}, full_name=full_name, terms=terms
+    )
+
+
+def application_review_filters():
+    filters = {
+        "name": request.values.get("name", "").strip(),
+        "email": request.values.get("email", "").strip(),
+        "id": request.values.get("id", "").strip(),
+        "status": request.values.get("status", "").strip(),
+    }
+    if filters["status"] not in APPLICATION_STATUSES:
+        filters["status"] = ""
+    return filters
 
 
 @app.route("/application_review", methods=["GET", "POST"])
@@ -560,31 +4385,85 @@ def application_review():
         flash("Access denied.")
         return redirect(url_for("login"))
 
-    applications = CoopApplication.query.all()
+    filters = application_review_filters()
+    after_id = request.values.get("after", type=int)
 
-    if request.method == "POST":
-        search_name = request.form.get("name")
-        search_email = request.form.get("email")
-        search_id = request.form.get("id")
-
-        if search_name:
-            applications = [
-                app
-                for app in applications
-                if search_name.lower() in app.full_name.lower()
-            ]
-        if search_email:
-            applications = [
-                app
-                for app in applications
-                if search_email.lower() in app.linkedin.lower()
-            ]
-        if search_id:
-            applications = [
-                app for app in applications if search_id == app.student_number
-            ]
+    applications, next_cursor = search_applications(
+        name=filters["name"],
+        email=filters["email"],
+        student_number=filters["id"],
+        status=filters["status"],
+        after_id=after_id,
+    )
+
+    return render_template(
+        "application_review.html",
+        applications=applications,
+        filters=filters,
+        statuses=APPLICATION_STATUSES,
+        next_cursor=next_cursor,
+        paged=bool(after_id),
+    )
+
+
+BULK_DECISIONS = {"accept": "Accepted", "reject": "Rejected"}
+
+
+@app.route("/bulk_decision", methods=["POST"])
+def bulk_decision():
+    if "user_id" not in session or session.get("role") != "coordinator":
+        flash("Access denied.")
+        return redirect(url_for("login"))
+
+    filters = application_review_filters()
+    new_status = BULK_DECISIONS.get(request.form.get("action"))
+    if new_status is None:
+        flash("Invalid decision.")
+        return redirect(url_for("application_review", **filters))
+
+    if request.form.get("scope") == "filter":
+        criteria = application_criteria(
+            filters["name"], filters["email"], filters["id"], filters["status"]
+        )
+        results = decide_applications(
+            new_status, criteria=criteria, changed_by=session["user_id"]
+        )
+    else:
+        # Selected rows are posted as "<id>:<version>" as rendered on the page.
+        expected_versions = {}
+        for value in request.form.getlist("app_ids"):
+            app_id, _, version = value.partition(":")
+            if app_id.isdigit() and version.isdigit():
+                expected_versions[int(app_id)] = int(version)
+        results = decide_applications(
+            new_status,
+            expected_versions=expected_versions,
+            changed_by=session["user_id"],
+        )
+
+    updated = [app_id for app_id, outcome in results.items() if outcome == "updated"]
+    if updated:
+        enqueue_job("application_status_reminders", application_ids=updated)
+        db.session.commit()
+        notify_job_workers()
+
+    if request.accept_mimetypes.best_match(["text/html", "application/json"]) == (
+        "application/json"
+    ):
+        return {"status": new_status, "results": results}
 
-    return render_template("application_review.html", applications=applications)
+    outcomes = {}
+    for app_id, outcome in sorted(results.items()):
+        outcomes.setdefault(outcome, []).append(str(app_id))
+    flash(f"{len(outcomes.get('updated', []))} application(s) marked {new_status}.")
+    for outcome, message in (
+        ("conflict", "Changed by someone else, reload and retry"),
+        ("already_decided", "Already decided"),
+        ("not_found", "Not found"),
+    ):
+        if outcome in outcomes:
+            flash(f"{message}: {', '.join(outcomes[outcome])}")
+    return redirect(url_for("application_review", **filters))
 
 
 @app.route("/accept_application/<int:app_id>", methods=["POST"])
@@ -598,8 +4477,11 @@ def accept_application(app_id):
         flash("Application not found.")
         return redirect(url_for("application_review"))
 
-    application.status = "Accepted"
+    application.set_status("Accepted", changed_by=session["user_id"])
+    enqueue_job("application_status_reminders", application_ids=[app_id])
     db.session.commit()
+    notify_job_workers()
+    status_events.notify()
     flash(f"Application for {application.full_name} has been accepted.")
     return redirect(url_for("application_review"))
 
@@ -614,8 +4496,11 @@ def reject_application(app_id):
         flash("Application not found.")
         return redirect(url_for("application_review"))
 
-    application.status = "Rejected"
+    application.set_status("Rejected", changed_by=session["user_id"])
+    enqueue_job("application_status_reminders", application_ids=[app_id])
     db.session.commit()
+    notify_job_workers()
+    status_events.notify()
     flash(f"Application for {application.full_name} has been rejected.")
     return redirect(url_for("application_review"))
 
@@ -625,13 +4510,7 @@ def view_reminders():
         flash("Access denied.")
         return redirect(url_for("login"))
 
-    user = User.query.get(session["user_id"])
-    if not user:
-        flash("User not found.")
-        return redirect(url_for("dashboard"))
-
-
-    reminders = []
+    reminders = student_reminders(session["user_id"])
 
     if not reminders:
         flash("No reminders found.")
@@ -640,33 +4519,192 @@ def view_reminders():
     return render_template("view_reminders.html", reminders=reminders)
 
 
-if __name__ == "__main__":
-    RESET_DB = 0  # Set to 1 to reset the database, keep as 0 to keep data
-    with app.app_context():
-        if RESET_DB:
-            db.drop_all()
-            db.create_all()
-
-            default_password = "password"
-
-            default_users = [
-                ("student", "student", "student@example.com", "Student Name"),
-                (
-                    "coordinator",
-                    "coordinator",
-                    "coordinator@example.com",
-                    "Coordinator Name",
+DEFAULT_USERS = [
+    ("student", "student", "student@example.com", "Student Name"),
+    ("coordinator", "coordinator", "coordinator@example.com", "Coordinator Name"),
+    ("employer", "employer", "employer@example.com", "Employer Name"),
+    ("admin", "admin", "admin@example.com", "Admin Name"),
+]
+
+
+database_lock = threading.RLock()
+# Config read when the engine is built. Changing these afterwards has no effect.
+ENGINE_CONFIG = {
+    "SQLALCHEMY_DATABASE_URI",
+    "SQLALCHEMY_ENGINE_OPTIONS",
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "DB_POOL_TIMEOUT",
+    "DB_POOL_RECYCLE",
+    "SQLITE_PRAGMAS",
+}
+
+
+def database_ready():
+    return "sqlalchemy" in app.extensions
+
+
+def init_database():
+    # Builds the engine from the current config and attaches the pragma and
+    # query instrumentation listeners. Runs once, from create_app() or the
+    # first app context, whichever comes first.
+    with database_lock:
+        if database_ready():
+            return
+        app.config.setdefault(
+            "SQLALCHEMY_ENGINE_OPTIONS",
+            database_engine_options(app.config["SQLALCHEMY_DATABASE_URI"]),
+        )
+        db.init_app(app)
+        with app.app_context():
+            engine = db.engine
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", apply_sqlite_pragmas)
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+@appcontext_pushed.connect_via(app)
+def init_database_on_first_use(sender, **extra):
+    if not database_ready():
+        init_database()
+
+
+def create_app(config=None):
+    # WSGI entry point, e.g. gunicorn "master:create_app()". Routes are
+    # registered on the module-level app as it is imported, so this applies
+    # any overrides, builds the engine from them and returns that app. Once
+    # the engine exists database settings can't change, so overriding them
+    # again raises instead of being silently ignored. It never touches the
+    # schema: run "flask --app master init-db" once before starting workers.
+    config = dict(config or {})
+    with database_lock:
+        if database_ready():
+            changed = sorted(
+                key
+                for key in ENGINE_CONFIG & config.keys()
+                if config[key] != app.config.get(key)
+            )
+            if changed:
+                raise RuntimeError(
+                    f"The database engine is already built; can't change "
+                    f"{', '.join(changed)}."
+                )
+        app.config.update(config)
+        init_database()
+    return app
+
+
+@app.cli.command("init-db")
+@click.option("--reset", is_flag=True, help="Drop every table first.")
+def init_db_command(reset):
+    if reset:
+        db.drop_all()
+    apply_migrations()
+    click.echo("Database initialised.")
+
+
+@app.cli.command("seed-db")
+@click.option("--password", default="password", show_default=True)
+def seed_db_command(password):
+    existing = set(
+        db.session.scalars(
+            db.select(User.username).where(
+                User.username.in_([username for _, username, _, _ in DEFAULT_USERS])
+            )
+        )
+    )
+    created = 0
+    for role, username, email, name in DEFAULT_USERS:
+        if username in existing:
+            continue
+        user = User(role=role, username=username, email=email, name=name)
+        user.set_password(password)
+        user.two_factor_enabled = False
+        db.session.add(user)
+        created += 1
+    db.session.commit()
+    click.echo(f"Created {created} default user(s).")
+
+
+def set_server_threads(threads):
+    # The hashing backpressure and event stream limits default to a share of
+    # SERVER_THREADS, so re-derive them when serve --threads changes it.
+    global password_hash_slots, event_stream_slots
+    app.config["SERVER_THREADS"] = threads
+    if "PASSWORD_HASH_MAX_PENDING" not in os.environ:
+        app.config["PASSWORD_HASH_MAX_PENDING"] = max(1, threads - 1)
+        password_hash_slots = threading.BoundedSemaphore(
+            app.config["PASSWORD_HASH_MAX_PENDING"]
+        )
+    if "EVENT_MAX_STREAMS" not in os.environ:
+        app.config["EVENT_MAX_STREAMS"] = max(1, threads // 2)
+        event_stream_slots = threading.BoundedSemaphore(app.config["EVENT_MAX_STREAMS"])
+
+
+def serve(bind=None, workers=None, threads=None, **options):
+    if threads:
+        set_server_threads(threads)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn doesn't run on Windows: fall back to Werkzeug's threaded
+        # server, still without the debugger or reloader.
+        from werkzeug.serving import run_simple
+
+        host, _, port = (bind or app.config["SERVER_BIND"]).rpartition(":")
+        app.logger.warning("gunicorn is not installed; serving with one process.")
+        run_simple(host or "127.0.0.1", int(port), app, threaded=True)
+        return
+
+    class Server(BaseApplication):
+        def load_config(self):
+            settings = {
+                "bind": bind or app.config["SERVER_BIND"],
+                "workers": workers or app.config["SERVER_WORKERS"],
+                "threads": threads or app.config["SERVER_THREADS"],
+                "worker_class": "gthread",
+                "keepalive": app.config["SERVER_KEEPALIVE"],
+                "timeout": app.config["SERVER_TIMEOUT"],
+                "graceful_timeout": app.config["SERVER_GRACEFUL_TIMEOUT"],
+                "accesslog": "-",
+                "worker_exit": lambda server, worker: stop_job_workers(
+                    app.config["SERVER_GRACEFUL_TIMEOUT"]
                 ),
-                ("employer", "employer", "employer@example.com", "Employer Name"),
-                ("admin", "admin", "admin@example.com", "Admin Name"),
-            ]
+            }
+            settings.update(
+                (key, value) for key, value in options.items() if value is not None
+            )
+            for key, value in settings.items():
+                self.cfg.set(key, value)
 
-            for role, username, email, name in default_users:
-                user = User(role=role, username=username, email=email, name=name)
-                user.set_password(default_password)
-                user.two_factor_enabled = False
-                db.session.add(user)
+        def load(self):
+            return app
 
-            db.session.commit()
+    Server().run()
 
-    app.run(debug=True)
+
+@app.cli.command("serve")
+@click.option("--bind", help="host:port, default SERVER_BIND.")
+@click.option("--workers", type=int, help="Worker processes.")
+@click.option("--threads", type=int, help="Threads per worker.")
+@click.option(
+    "--timeout",
+    type=int,
+    help="Seconds before an unresponsive worker process restarts.",
+)
+@click.option("--keepalive", type=int, help="Seconds to hold idle connections.")
+@click.option("--graceful-timeout", type=int, help="Seconds to drain on shutdown.")
+def serve_command(bind, workers, threads, timeout, keepalive, graceful_timeout):
+    serve(
+        bind,
+        workers,
+        threads,
+        timeout=timeout,
+        keepalive=keepalive,
+        graceful_timeout=graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    serve()